@@ -9,6 +9,7 @@ from fastapi.middleware.cors import CORSMiddleware
 
 from shared.config import get_settings
 from shared.health import router as health_router
+from shared.health_interceptor import install_health_interceptor
 from shared.database import close_database
 
 # Configure logging
@@ -48,6 +49,9 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Serve liveness/startup probes outside the middleware stack and router
+install_health_interceptor(app, include_timestamp=True)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
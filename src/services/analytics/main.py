@@ -26,7 +26,7 @@ app = FastAPI(
 settings = get_settings()
 
 # Setup middleware
-setup_middleware(app)
+setup_middleware(app, service_name="analytics")
 
 # CORS middleware
 app.add_middleware(
@@ -38,12 +38,6 @@ app.add_middleware(
 )
 
 
-@app.get("/health")
-async def health_check():
-    """Health check endpoint"""
-    return {"status": "healthy", "service": "analytics"}
-
-
 @app.get("/ready")
 async def readiness_check():
     """Readiness check endpoint"""
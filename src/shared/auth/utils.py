@@ -8,8 +8,12 @@ from passlib.context import CryptContext
 
 from src.shared.config import get_settings
 
-# Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing context; tests use bcrypt's minimum cost factor, as the
+# default work factor would dominate suite runtime
+if get_settings().environment == "testing":
+    pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=4)
+else:
+    pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -66,9 +70,18 @@ def validate_password_strength(password: str) -> bool:
     if len(password) < settings.password_min_length:
         return False
     
-    # Check for at least one uppercase, lowercase, and digit
-    has_upper = any(c.isupper() for c in password)
-    has_lower = any(c.islower() for c in password)
-    has_digit = any(c.isdigit() for c in password)
+    # Check for at least one uppercase, lowercase, and digit in a single pass
+    has_upper = has_lower = has_digit = False
+    for c in password:
+        if c.isupper():
+            has_upper = True
+        elif c.islower():
+            has_lower = True
+        elif c.isdigit():
+            has_digit = True
+        else:
+            continue
+        if has_upper and has_lower and has_digit:
+            return True
     
-    return has_upper and has_lower and has_digit
\ No newline at end of file
+    return False
\ No newline at end of file
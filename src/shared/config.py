@@ -1,10 +1,10 @@
 """Configuration management using Pydantic Settings."""
 
 from functools import lru_cache
-from typing import List, Optional
+from typing import Annotated, List, Optional
 
-from pydantic import Field, validator
-from pydantic_settings import BaseSettings
+from pydantic import Field, field_validator, validator
+from pydantic_settings import BaseSettings, NoDecode
 
 
 class Settings(BaseSettings):
@@ -42,6 +42,12 @@ class Settings(BaseSettings):
     opensearch_timeout: int = Field(default=30, description="OpenSearch timeout in seconds")
     opensearch_max_retries: int = Field(default=3, description="OpenSearch max retries")
     
+    # Health check settings
+    readiness_check_timeout: float = Field(
+        default=2.0,
+        description="Per-dependency timeout for readiness checks in seconds"
+    )
+    
     # Security settings
     jwt_secret_key: str = Field(
         default="your-secret-key-change-in-production",
@@ -52,7 +58,8 @@ class Settings(BaseSettings):
     password_min_length: int = Field(default=8, description="Minimum password length")
     
     # CORS settings
-    cors_origins: List[str] = Field(
+    # NoDecode: the env value is a comma-separated string, not JSON
+    cors_origins: Annotated[List[str], NoDecode] = Field(
         default=["http://localhost:3000", "http://localhost:8080"],
         description="CORS allowed origins"
     )
@@ -86,7 +93,8 @@ class Settings(BaseSettings):
             raise ValueError(f'Log level must be one of: {valid_levels}')
         return v.upper()
     
-    @validator('cors_origins', pre=True)
+    @field_validator('cors_origins', mode='before')
+    @classmethod
     def parse_cors_origins(cls, v):
         """Parse CORS origins from string or list."""
         if isinstance(v, str):
@@ -139,7 +139,7 @@ class ServiceMonitor:
     
     async def _perform_health_check(self) -> bool:
         """Perform health check and update metrics."""
-        start_time = time.time()
+        start_time = time.perf_counter()
         
         try:
             # Call health check function
@@ -149,7 +149,7 @@ class ServiceMonitor:
                 result = self.health_check_func()
             
             # Calculate response time
-            response_time = (time.time() - start_time) * 1000  # Convert to milliseconds
+            response_time = (time.perf_counter() - start_time) * 1000  # Convert to milliseconds
             self.metrics.response_time_ms = response_time
             self.metrics.last_check = time.time()
             
@@ -159,10 +159,10 @@ class OpenSearchManager:
             bool: True if search operation succeeds
         """
         try:
-            # Perform a simple search that should work on any cluster
+            # Perform a simple search that should work on any cluster;
+            # no hits are needed, only a successful round-trip
             await self.client.search(
-                index="_all",
-                body={"query": {"match_all": {}}, "size": 1}
+                body={"query": {"match_all": {}}, "size": 0}
             )
             return True
         except Exception as e:
@@ -2,9 +2,12 @@
 Redis client connection management with connection pooling and resilience features.
 """
 import asyncio
+import itertools
 import logging
+import os
+import socket
 import time
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Type
 from urllib.parse import urlparse
 
 import redis.asyncio as aioredis
@@ -16,6 +19,23 @@ from .retry import with_retry
 
 logger = logging.getLogger(__name__)
 
+# Probe keys are unique per call: a random per-process token keeps workers
+# sharing a Redis instance apart, and the counter keeps overlapping probes in
+# one process from reading or deleting each other's key
+_HEALTH_KEY_PREFIX = b"health_check_test:%s:" % os.urandom(4).hex().encode()
+_probe_counter = itertools.count()
+
+# Detect dead peers within ~90s instead of the kernel's 2h keepalive default.
+# The TCP_KEEP* constants are Linux-specific, so fall back to OS defaults elsewhere.
+if hasattr(socket, "TCP_KEEPIDLE"):
+    _KEEPALIVE_OPTIONS = {
+        socket.TCP_KEEPIDLE: 60,
+        socket.TCP_KEEPINTVL: 10,
+        socket.TCP_KEEPCNT: 3,
+    }
+else:
+    _KEEPALIVE_OPTIONS = {}
+
 
 class RedisManager:
     """
@@ -25,11 +45,21 @@ class RedisManager:
     def __init__(self):
         self._client: Optional[aioredis.Redis] = None
         self._pool: Optional[aioredis.ConnectionPool] = None
+        self._probe_client: Optional[aioredis.Redis] = None
+        self._probe_pool: Optional[aioredis.ConnectionPool] = None
         self._settings = get_settings()
         
-    def _create_connection_pool(self) -> aioredis.ConnectionPool:
+    def _create_connection_pool(
+        self,
+        pool_class: Type[aioredis.ConnectionPool] = aioredis.ConnectionPool,
+        **overrides: Any,
+    ) -> aioredis.ConnectionPool:
         """
         Create Redis connection pool with proper configuration.
+        
+        Args:
+            pool_class: Connection pool class to instantiate
+            **overrides: Pool options that replace the defaults below
         """
         # Parse Redis URL
         parsed_url = urlparse(self._settings.redis_url)
@@ -43,7 +73,7 @@ class RedisManager:
             "socket_timeout": self._settings.redis_socket_timeout,
             "socket_connect_timeout": self._settings.redis_socket_timeout,
             "socket_keepalive": True,
-            "socket_keepalive_options": {},
+            "socket_keepalive_options": _KEEPALIVE_OPTIONS,
             "health_check_interval": 30,  # Health check every 30 seconds
             "retry_on_timeout": True,
             "decode_responses": True,
@@ -55,8 +85,10 @@ class RedisManager:
             pool_config["password"] = parsed_url.password
         if parsed_url.username:
             pool_config["username"] = parsed_url.username
-            
-        return aioredis.ConnectionPool(**pool_config)
+        
+        pool_config.update(overrides)
+        
+        return pool_class(**pool_config)
     
     @property
     def pool(self) -> aioredis.ConnectionPool:
@@ -72,6 +104,26 @@ class RedisManager:
             self._client = aioredis.Redis(connection_pool=self.pool)
         return self._client
     
+    @property
+    def probe_client(self) -> aioredis.Redis:
+        """
+        Get or create the Redis client used by operation probes.
+        
+        Uses a small dedicated pool without response decoding so probe
+        round-trips compare raw bytes instead of decoding every reply. The
+        pool blocks when exhausted, so concurrent probes queue for a
+        connection instead of failing with "Too many connections".
+        """
+        if self._probe_client is None:
+            self._probe_pool = self._create_connection_pool(
+                pool_class=aioredis.BlockingConnectionPool,
+                decode_responses=False,
+                max_connections=2,
+                timeout=self._settings.redis_socket_timeout,
+            )
+            self._probe_client = aioredis.Redis(connection_pool=self._probe_pool)
+        return self._probe_client
+    
     @circuit_breaker("redis", fail_max=5, reset_timeout=60)
     @with_retry(max_retries=3, base_delay=1.0)
     async def health_check(self) -> Dict[str, Any]:
@@ -114,12 +166,10 @@ class RedisManager:
             }
             health_status["performance"]["info_query_time_ms"] = round(info_time, 2)
             
-            # Connection pool information
+            # Connection pool information (public attributes only; the pool's
+            # private bookkeeping differs between redis-py releases)
             health_status["connection_pool"] = {
-                "max_connections": self._settings.redis_max_connections,
-                "created_connections": self.pool.created_connections,
-                "available_connections": len(self.pool._available_connections),
-                "in_use_connections": len(self.pool._in_use_connections)
+                "max_connections": self.pool.max_connections,
             }
             
             # Performance thresholds
@@ -160,17 +210,18 @@ class RedisManager:
         """
         try:
             # Test basic set/get operations
-            test_key = "health_check_test"
-            test_value = f"test_value_{int(time.time())}"
+            test_value = str(next(_probe_counter)).encode()
+            test_key = _HEALTH_KEY_PREFIX + test_value
             
-            await self.client.set(test_key, test_value, ex=60)  # Expire in 60 seconds
-            retrieved_value = await self.client.get(test_key)
+            # Expire in 60 seconds in case the delete below never runs
+            await self.probe_client.set(test_key, test_value, ex=60)
+            retrieved_value = await self.probe_client.get(test_key)
             
             if retrieved_value != test_value:
                 raise Exception("Set/Get operation returned unexpected result")
             
             # Clean up test key
-            await self.client.delete(test_key)
+            await self.probe_client.delete(test_key)
             return True
             
         except Exception as e:
@@ -192,7 +243,13 @@ class RedisManager:
         }
     
     async def close(self) -> None:
-        """Close Redis client and connection pool."""
+        """Close Redis clients and connection pools."""
+        if self._probe_client:
+            await self._probe_client.aclose()
+            self._probe_client = None
+        if self._probe_pool:
+            await self._probe_pool.aclose()
+            self._probe_pool = None
         if self._client:
             await self._client.aclose()
             self._client = None
@@ -12,6 +12,9 @@ logger = logging.getLogger(__name__)
 
 F = TypeVar('F', bound=Callable[..., Any])
 
+# Size of the precomputed jitter ring (must be a power of two)
+_JITTER_RING_SIZE = 1024
+
 
 class RetryError(Exception):
     """Exception raised when all retry attempts are exhausted."""
@@ -53,6 +56,24 @@ class RetryManager:
         self.exponential_base = exponential_base
         self.jitter = jitter
         self.retryable_exceptions = retryable_exceptions or [Exception]
+        self._exhausted_msg = f"All {max_retries + 1} attempts failed"
+        
+        # Per-manager RNG avoids contending on the module-level random lock;
+        # jitter multipliers (±10%) are drawn up front and consumed in rotation
+        self._rng = random.Random()
+        self._jitter_ring = tuple(
+            self._rng.uniform(-0.1, 0.1) for _ in range(_JITTER_RING_SIZE)
+        ) if jitter else ()
+        self._jitter_cursor = 0
+        
+        # Capped backoff for every attempt execute_with_retry can reach
+        self._delay_table = tuple(
+            self._backoff(attempt) for attempt in range(max_retries + 1)
+        )
+    
+    def _backoff(self, attempt: int) -> float:
+        """Exponential backoff for the given attempt, capped at max_delay."""
+        return min(self.base_delay * (self.exponential_base ** attempt), self.max_delay)
     
     def _calculate_delay(self, attempt: int) -> float:
         """
@@ -64,16 +85,16 @@ class RetryManager:
         Returns:
             Delay in seconds
         """
-        # Exponential backoff
-        delay = self.base_delay * (self.exponential_base ** attempt)
-        
-        # Cap at max delay
-        delay = min(delay, self.max_delay)
+        # Exponential backoff capped at max delay, precomputed for known attempts
+        if attempt < len(self._delay_table):
+            delay = self._delay_table[attempt]
+        else:
+            delay = self._backoff(attempt)
         
         # Add jitter (±10% of delay)
         if self.jitter:
-            jitter_amount = delay * 0.1
-            delay += random.uniform(-jitter_amount, jitter_amount)
+            delay *= 1 + self._jitter_ring[self._jitter_cursor]
+            self._jitter_cursor = (self._jitter_cursor + 1) & (_JITTER_RING_SIZE - 1)
         
         return max(0, delay)
     
@@ -136,7 +157,7 @@ class RetryManager:
         
         # All attempts exhausted
         raise RetryError(
-            f"All {self.max_retries + 1} attempts failed",
+            self._exhausted_msg,
             last_exception,
             self.max_retries + 1
         )
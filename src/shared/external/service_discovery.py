@@ -2,26 +2,45 @@
 Service discovery integration for dynamic service endpoints.
 """
 import asyncio
+import bisect
+import heapq
+import itertools
 import logging
+import random
+import time
 from abc import ABC, abstractmethod
-from typing import Dict, List, Optional, Tuple
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 from urllib.parse import urlparse
 
 from ..config import get_settings
 
+if TYPE_CHECKING:
+    import aiohttp
+
 logger = logging.getLogger(__name__)
 
+# Default ports for common services
+_DEFAULT_PORTS = {
+    "database": 5432,
+    "postgres": 5432,
+    "redis": 6379,
+    "opensearch": 9200,
+    "elasticsearch": 9200
+}
+
 
 class ServiceEndpoint:
     """Represents a service endpoint with health status."""
     
+    __slots__ = ("host", "port", "scheme", "weight", "healthy", "last_check")
+    
     def __init__(self, host: str, port: int, scheme: str = "http", weight: int = 1):
         self.host = host
         self.port = port
         self.scheme = scheme
         self.weight = weight
         self.healthy = True
-        self.last_check = None
+        self.last_check = 0.0  # time.monotonic() of the last health check; 0.0 = never
         
     @property
     def url(self) -> str:
@@ -38,13 +57,20 @@ class ServiceEndpoint:
 class ServiceDiscovery(ABC):
     """Abstract base class for service discovery implementations."""
     
+    # Whether health checks go over HTTP and benefit from a shared session
+    uses_http_session = False
+    
     @abstractmethod
     async def discover_endpoints(self, service_name: str) -> List[ServiceEndpoint]:
         """Discover endpoints for a given service."""
         pass
     
     @abstractmethod
-    async def health_check_endpoint(self, endpoint: ServiceEndpoint) -> bool:
+    async def health_check_endpoint(
+        self,
+        endpoint: ServiceEndpoint,
+        session: Optional["aiohttp.ClientSession"] = None
+    ) -> bool:
         """Check if an endpoint is healthy."""
         pass
 
@@ -102,19 +128,23 @@ class StaticServiceDiscovery(ServiceDiscovery):
         """Discover endpoints for a given service from static configuration."""
         return self._static_endpoints.get(service_name, [])
     
-    async def health_check_endpoint(self, endpoint: ServiceEndpoint) -> bool:
+    async def health_check_endpoint(
+        self,
+        endpoint: ServiceEndpoint,
+        session: Optional["aiohttp.ClientSession"] = None
+    ) -> bool:
         """Basic health check for static endpoints."""
-        import socket
-        
         try:
-            # Simple TCP connection test
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(5)  # 5 second timeout
-            result = sock.connect_ex((endpoint.host, endpoint.port))
-            sock.close()
-            return result == 0
-        except Exception as e:
-            logger.warning(f"Health check failed for {endpoint}: {e}")
+            # Simple TCP connection test without blocking the event loop
+            _, writer = await asyncio.wait_for(
+                asyncio.open_connection(endpoint.host, endpoint.port),
+                timeout=1.0
+            )
+            writer.close()
+            await writer.wait_closed()
+            return True
+        except (OSError, asyncio.TimeoutError) as e:
+            logger.warning(f"Health check failed for {endpoint}: {e!r}")
             return False
 
 
@@ -124,10 +154,20 @@ class KubernetesServiceDiscovery(ServiceDiscovery):
     Suitable for Kubernetes deployments.
     """
     
+    uses_http_session = True
+    
     def __init__(self, namespace: str = "default"):
         self.namespace = namespace
-        self._service_cache = {}
+        self._service_cache: Dict[str, Tuple[float, List[ServiceEndpoint]]] = {}
         self._cache_ttl = 300  # 5 minutes
+        self._dns_locks: Dict[str, asyncio.Lock] = {}
+    
+    def _get_cached(self, service_name: str) -> Optional[List[ServiceEndpoint]]:
+        """Return cached endpoints for a service if they have not expired."""
+        cached = self._service_cache.get(service_name)
+        if cached is not None and time.monotonic() - cached[0] < self._cache_ttl:
+            return list(cached[1])
+        return None
     
     async def discover_endpoints(self, service_name: str) -> List[ServiceEndpoint]:
         """
@@ -136,39 +176,49 @@ class KubernetesServiceDiscovery(ServiceDiscovery):
         In Kubernetes, services are accessible via DNS:
         - <service-name>.<namespace>.svc.cluster.local
         - <service-name> (within same namespace)
+        
+        Successful lookups are cached for the cache TTL, and concurrent
+        lookups for the same service share a single DNS query.
         """
         # For MVP, we'll use simple DNS resolution
         # In production, you might use the Kubernetes API
         
+        endpoints = self._get_cached(service_name)
+        if endpoints is not None:
+            return endpoints
+        
+        lock = self._dns_locks.setdefault(service_name, asyncio.Lock())
+        async with lock:
+            # Another coroutine may have resolved it while we waited
+            endpoints = self._get_cached(service_name)
+            if endpoints is not None:
+                return endpoints
+            
+            return await self._resolve_endpoints(service_name)
+    
+    async def _resolve_endpoints(self, service_name: str) -> List[ServiceEndpoint]:
+        """Resolve service DNS and cache the resulting endpoints."""
         endpoints = []
+        port = _DEFAULT_PORTS.get(service_name, 80)
         
-        # Try service name within namespace
-        service_dns = f"{service_name}.{self.namespace}.svc.cluster.local"
+        # Fully-qualified name with a trailing dot so the resolver skips
+        # search-domain expansion (ndots:5 would otherwise try each suffix)
+        service_dns = f"{service_name}.{self.namespace}.svc.cluster.local."
         
         try:
-            import socket
-            
-            # Resolve DNS to get IP addresses
-            addr_info = socket.getaddrinfo(service_dns, None)
+            # Resolve DNS without blocking the event loop
+            addr_info = await asyncio.get_running_loop().getaddrinfo(service_dns, None)
             unique_ips = set(info[4][0] for info in addr_info)
             
-            # Default ports for common services
-            default_ports = {
-                "database": 5432,
-                "postgres": 5432,
-                "redis": 6379,
-                "opensearch": 9200,
-                "elasticsearch": 9200
-            }
-            
-            port = default_ports.get(service_name, 80)
-            
             for ip in unique_ips:
                 endpoints.append(ServiceEndpoint(
                     host=ip,
                     port=port,
                     scheme="http"  # Default to HTTP, override as needed
                 ))
+            
+            self._service_cache[service_name] = (time.monotonic(), endpoints)
+            endpoints = list(endpoints)
                 
         except Exception as e:
             logger.warning(f"Failed to discover endpoints for {service_name}: {e}")
@@ -176,20 +226,35 @@ class KubernetesServiceDiscovery(ServiceDiscovery):
             # Fallback to simple service name (works within same namespace)
             endpoints.append(ServiceEndpoint(
                 host=service_name,
-                port=default_ports.get(service_name, 80),
+                port=port,
                 scheme="http"
             ))
         
         return endpoints
     
-    async def health_check_endpoint(self, endpoint: ServiceEndpoint) -> bool:
-        """Health check using HTTP request to /health endpoint."""
+    async def health_check_endpoint(
+        self,
+        endpoint: ServiceEndpoint,
+        session: Optional["aiohttp.ClientSession"] = None
+    ) -> bool:
+        """
+        Health check using HTTP request to /health endpoint.
+        
+        Args:
+            endpoint: Endpoint to check
+            session: Shared client session to reuse pooled connections;
+                a one-off session is created when omitted
+        """
         import aiohttp
         
+        health_url = f"{endpoint.url}/health"
         try:
+            if session is not None:
+                async with session.get(health_url) as response:
+                    return response.status == 200
+            
             timeout = aiohttp.ClientTimeout(total=5)
             async with aiohttp.ClientSession(timeout=timeout) as session:
-                health_url = f"{endpoint.url}/health"
                 async with session.get(health_url) as response:
                     return response.status == 200
         except Exception as e:
@@ -206,7 +271,55 @@ class ServiceRegistry:
         self.discovery = discovery
         self._endpoints_cache: Dict[str, List[ServiceEndpoint]] = {}
         self._health_check_interval = 30  # seconds
-        self._health_check_tasks: Dict[str, asyncio.Task] = {}
+        self._health_check_timeout = 2.0  # seconds per endpoint
+        self._health_check_jitter = 2.0  # max extra seconds between ticks
+        self._session: Optional["aiohttp.ClientSession"] = None
+        
+        # Per-service (cumulative weights, healthy endpoints, total weight),
+        # rebuilt only when the (endpoint, healthy) signature changes
+        self._weighted: Dict[str, Tuple[List[int], List[ServiceEndpoint], int]] = {}
+        self._weight_signatures: Dict[str, Tuple[Tuple[int, bool], ...]] = {}
+        self._round_robin = itertools.count()
+        
+        # Min-heap of (next check deadline, sequence, service, endpoint) served
+        # by a single scheduler task that batches all due checks together
+        self._due: List[Tuple[float, int, str, ServiceEndpoint]] = []
+        self._due_sequence = itertools.count()
+        self._due_changed = asyncio.Event()
+        self._scheduler_task: Optional[asyncio.Task] = None
+    
+    def _get_session(self) -> Optional["aiohttp.ClientSession"]:
+        """
+        Get or create the pooled HTTP session used for endpoint health checks.
+        
+        Returns:
+            Shared session, or None if the discovery backend does not check over HTTP
+        """
+        if not self.discovery.uses_http_session:
+            return None
+        
+        if self._session is None or self._session.closed:
+            import aiohttp
+            
+            self._session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=5),
+                connector=aiohttp.TCPConnector(
+                    limit=200,
+                    limit_per_host=10,
+                    keepalive_timeout=60,
+                    ttl_dns_cache=300,
+                ),
+            )
+        return self._session
+    
+    async def _ensure_tracked(self, service_name: str) -> None:
+        """Discover a service's endpoints on first use and start its health checks."""
+        if service_name not in self._endpoints_cache:
+            await self._refresh_endpoints(service_name)
+        
+        # Start health checking if not already running
+        if self._scheduler_task is None:
+            self._scheduler_task = asyncio.create_task(self._health_check_scheduler())
     
     async def get_healthy_endpoints(self, service_name: str) -> List[ServiceEndpoint]:
         """
@@ -218,14 +331,7 @@ class ServiceRegistry:
         Returns:
             List of healthy endpoints
         """
-        if service_name not in self._endpoints_cache:
-            await self._refresh_endpoints(service_name)
-        
-        # Start health checking if not already running
-        if service_name not in self._health_check_tasks:
-            self._health_check_tasks[service_name] = asyncio.create_task(
-                self._health_check_loop(service_name)
-            )
+        await self._ensure_tracked(service_name)
         
         # Return only healthy endpoints
         return [ep for ep in self._endpoints_cache.get(service_name, []) if ep.healthy]
@@ -240,71 +346,178 @@ class ServiceRegistry:
         Returns:
             Best available endpoint or None if no healthy endpoints
         """
-        healthy_endpoints = await self.get_healthy_endpoints(service_name)
+        await self._ensure_tracked(service_name)
+        
+        weighted = self._weighted.get(service_name)
+        if weighted is None:
+            weighted = self._update_weights(service_name)
+        cum_weights, healthy_endpoints, total_weight = weighted
         
         if not healthy_endpoints:
             return None
         
-        # Simple weighted selection (higher weight = higher probability)
-        total_weight = sum(ep.weight for ep in healthy_endpoints)
+        # Round-robin if all weights are 0
         if total_weight == 0:
-            return healthy_endpoints[0]  # Return first if all weights are 0
+            return healthy_endpoints[next(self._round_robin) % len(healthy_endpoints)]
         
-        # For now, just return the highest weight endpoint
-        # In production, you might implement proper weighted round-robin
-        return max(healthy_endpoints, key=lambda ep: ep.weight)
+        # Weighted random selection (higher weight = higher probability)
+        index = bisect.bisect_right(cum_weights, random.randrange(total_weight))
+        return healthy_endpoints[index]
+    
+    def _update_weights(
+        self, service_name: str
+    ) -> Tuple[List[int], List[ServiceEndpoint], int]:
+        """
+        Rebuild the cumulative weight table for a service if its healthy set changed.
+        
+        Args:
+            service_name: Name of the service
+            
+        Returns:
+            Tuple of (cumulative weights, healthy endpoints, total weight)
+        """
+        endpoints = self._endpoints_cache.get(service_name, [])
+        signature = tuple((id(ep), ep.healthy) for ep in endpoints)
+        
+        weighted = self._weighted.get(service_name)
+        if weighted is not None and self._weight_signatures.get(service_name) == signature:
+            return weighted
+        
+        healthy_endpoints = [ep for ep in endpoints if ep.healthy]
+        cum_weights = list(itertools.accumulate(ep.weight for ep in healthy_endpoints))
+        total_weight = cum_weights[-1] if cum_weights else 0
+        
+        weighted = (cum_weights, healthy_endpoints, total_weight)
+        self._weighted[service_name] = weighted
+        self._weight_signatures[service_name] = signature
+        return weighted
     
     async def _refresh_endpoints(self, service_name: str) -> None:
         """Refresh endpoints for a service."""
         try:
             endpoints = await self.discovery.discover_endpoints(service_name)
+            previous = self._endpoints_cache.get(service_name, [])
             self._endpoints_cache[service_name] = endpoints
+            self._update_weights(service_name)
+            
+            # Check newly discovered endpoints right away
+            now = time.monotonic()
+            for endpoint in endpoints:
+                if endpoint not in previous:
+                    self._schedule_check(now, service_name, endpoint)
             logger.info(f"Discovered {len(endpoints)} endpoints for service '{service_name}'")
         except Exception as e:
             logger.error(f"Failed to refresh endpoints for service '{service_name}': {e}")
     
-    async def _health_check_loop(self, service_name: str) -> None:
-        """Continuous health checking loop for a service."""
+    def _schedule_check(self, deadline: float, service_name: str, endpoint: ServiceEndpoint) -> None:
+        """Queue an endpoint health check and wake the scheduler if it is now first."""
+        heapq.heappush(self._due, (deadline, next(self._due_sequence), service_name, endpoint))
+        if self._due[0][3] is endpoint:
+            self._due_changed.set()
+    
+    async def _health_check_scheduler(self) -> None:
+        """Single health checking loop that runs every due endpoint check in one batch."""
         while True:
             try:
-                endpoints = self._endpoints_cache.get(service_name, [])
+                if not self._due:
+                    self._due_changed.clear()
+                    await self._due_changed.wait()
+                    continue
                 
-                # Check health of all endpoints
-                health_tasks = [
-                    self.discovery.health_check_endpoint(ep) for ep in endpoints
-                ]
+                # Sleep until the earliest deadline, or until an earlier one is queued
+                delay = self._due[0][0] - time.monotonic()
+                if delay > 0:
+                    self._due_changed.clear()
+                    try:
+                        await asyncio.wait_for(self._due_changed.wait(), timeout=delay)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
                 
-                if health_tasks:
-                    health_results = await asyncio.gather(*health_tasks, return_exceptions=True)
-                    
-                    for endpoint, is_healthy in zip(endpoints, health_results):
-                        if isinstance(is_healthy, Exception):
-                            endpoint.healthy = False
-                            logger.warning(f"Health check error for {endpoint}: {is_healthy}")
-                        else:
-                            endpoint.healthy = is_healthy
-                            endpoint.last_check = asyncio.get_event_loop().time()
+                now = time.monotonic()
+                batch = []
+                while self._due and self._due[0][0] <= now:
+                    batch.append(heapq.heappop(self._due))
                 
-                await asyncio.sleep(self._health_check_interval)
+                await self._run_health_checks(batch)
                 
             except asyncio.CancelledError:
                 break
             except Exception as e:
-                logger.error(f"Error in health check loop for '{service_name}': {e}")
+                logger.error(f"Error in health check scheduler: {e}")
                 await asyncio.sleep(self._health_check_interval)
     
+    async def _run_health_checks(
+        self, batch: List[Tuple[float, int, str, ServiceEndpoint]]
+    ) -> None:
+        """Check a batch of due endpoints concurrently and reschedule them."""
+        # Skip endpoints dropped by an endpoint refresh since they were queued
+        batch = [
+            entry for entry in batch
+            if entry[3] in self._endpoints_cache.get(entry[2], ())
+        ]
+        if not batch:
+            return
+        
+        try:
+            results = await asyncio.gather(
+                *(self._check_endpoint(endpoint) for _, _, _, endpoint in batch),
+                return_exceptions=True,
+            )
+            
+            checked_at = time.monotonic()
+            checked_services = set()
+            for (_, _, service_name, endpoint), is_healthy in zip(batch, results):
+                if isinstance(is_healthy, Exception):
+                    # Includes asyncio.TimeoutError from a hung endpoint
+                    endpoint.healthy = False
+                    logger.warning(f"Health check error for {endpoint}: {is_healthy}")
+                else:
+                    endpoint.healthy = is_healthy
+                    endpoint.last_check = checked_at
+                checked_services.add(service_name)
+            
+            for service_name in checked_services:
+                self._update_weights(service_name)
+        finally:
+            # The batch was popped from the heap, so reschedule every entry even
+            # if checking failed; otherwise its endpoints are never checked again
+            next_check = time.monotonic() + self._health_check_interval
+            for _, _, service_name, endpoint in batch:
+                # Jitter the next check so endpoints don't settle into lockstep
+                self._schedule_check(
+                    next_check + random.uniform(0, self._health_check_jitter),
+                    service_name,
+                    endpoint,
+                )
+    
+    async def _check_endpoint(self, endpoint: ServiceEndpoint) -> bool:
+        """Check one endpoint over the shared session, bounded by the check timeout."""
+        # Resolved per endpoint so a session failure is reported as that
+        # endpoint's check error instead of aborting the whole batch
+        session = self._get_session()
+        return await asyncio.wait_for(
+            self.discovery.health_check_endpoint(endpoint, session=session),
+            timeout=self._health_check_timeout,
+        )
+    
     async def close(self) -> None:
         """Close the service registry and cleanup resources."""
-        # Cancel all health check tasks
-        for task in self._health_check_tasks.values():
-            task.cancel()
-        
-        # Wait for tasks to complete
-        if self._health_check_tasks:
-            await asyncio.gather(*self._health_check_tasks.values(), return_exceptions=True)
+        # Cancel the health check scheduler and wait for it to finish
+        if self._scheduler_task is not None:
+            self._scheduler_task.cancel()
+            await asyncio.gather(self._scheduler_task, return_exceptions=True)
+            self._scheduler_task = None
         
-        self._health_check_tasks.clear()
+        self._due.clear()
         self._endpoints_cache.clear()
+        self._weighted.clear()
+        self._weight_signatures.clear()
+        
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+        
         logger.info("Service registry closed")
 
 
@@ -1,35 +1,57 @@
 """
 Health check endpoints for database and system monitoring.
 """
+import asyncio
 import logging
-from datetime import datetime, timezone
-from typing import Dict, Any
+from typing import Any, Awaitable, Callable, Dict, Tuple
 
 from fastapi import APIRouter, HTTPException, status
 
+from .config import get_settings
 from .database.connection import get_database_health
 from .external.opensearch import get_opensearch_health
 from .external.redis import get_redis_health
 from .external.circuit_breaker import get_circuit_breaker_metrics
+from .health_interceptor import now_iso
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(tags=["Health"])
 
+# External dependencies probed by readiness and detailed health checks
+_DEPENDENCY_CHECKS: Tuple[Tuple[str, Callable[[], Awaitable[Dict[str, Any]]]], ...] = (
+    ("database", get_database_health),
+    ("redis", get_redis_health),
+    ("opensearch", get_opensearch_health),
+)
 
-@router.get("/health")
-async def health_check() -> Dict[str, Any]:
+
+async def _run_dependency_checks() -> Dict[str, Dict[str, Any]]:
     """
-    Basic health check endpoint for Kubernetes liveness probe.
+    Run all dependency health checks concurrently, each bounded by a timeout.
     
     Returns:
-        dict: Basic health status
+        dict: Health result per dependency; failed or timed-out checks are
+        reported as unhealthy with an error message
     """
-    return {
-        "status": "healthy",
-        "service": "coins-for-change",
-        "timestamp": datetime.now(timezone.utc).isoformat(),
-    }
+    timeout = get_settings().readiness_check_timeout
+    results = await asyncio.gather(
+        *(asyncio.wait_for(check(), timeout=timeout) for _, check in _DEPENDENCY_CHECKS),
+        return_exceptions=True,
+    )
+    
+    checks = {}
+    for (name, _), result in zip(_DEPENDENCY_CHECKS, results):
+        if isinstance(result, asyncio.TimeoutError):
+            checks[name] = {"status": "unhealthy", "error": "timeout"}
+            logger.error(f"{name} health check timed out after {timeout}s")
+        elif isinstance(result, Exception):
+            checks[name] = {"status": "unhealthy", "error": str(result)}
+            logger.error(f"{name} health check failed: {result}")
+        else:
+            checks[name] = result
+    
+    return checks
 
 
 @router.get("/ready")
@@ -44,56 +66,10 @@ async def readiness_check() -> Dict[str, Any]:
     Raises:
         HTTPException: 503 if service is not ready
     """
-    checks = {}
+    checks = await _run_dependency_checks()
     overall_status = "ready"
-    
-    # Database health check
-    try:
-        db_health = await get_database_health()
-        checks["database"] = db_health
-        
-        if db_health["status"] != "healthy":
-            overall_status = "not_ready"
-            
-    except Exception as e:
-        checks["database"] = {
-            "status": "unhealthy",
-            "error": str(e)
-        }
-        overall_status = "not_ready"
-        logger.error(f"Database health check failed: {e}")
-    
-    # Redis health check
-    try:
-        redis_health = await get_redis_health()
-        checks["redis"] = redis_health
-        
-        if redis_health["status"] != "healthy":
-            overall_status = "not_ready"
-            
-    except Exception as e:
-        checks["redis"] = {
-            "status": "unhealthy",
-            "error": str(e)
-        }
-        overall_status = "not_ready"
-        logger.error(f"Redis health check failed: {e}")
-    
-    # OpenSearch health check
-    try:
-        opensearch_health = await get_opensearch_health()
-        checks["opensearch"] = opensearch_health
-        
-        if opensearch_health["status"] != "healthy":
-            overall_status = "not_ready"
-            
-    except Exception as e:
-        checks["opensearch"] = {
-            "status": "unhealthy",
-            "error": str(e)
-        }
+    if any(check["status"] != "healthy" for check in checks.values()):
         overall_status = "not_ready"
-        logger.error(f"OpenSearch health check failed: {e}")
     
     # Overall readiness assessment
     if overall_status != "ready":
@@ -102,31 +78,14 @@ async def readiness_check() -> Dict[str, Any]:
             detail={
                 "status": overall_status,
                 "checks": checks,
-                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "timestamp": now_iso(),
             }
         )
     
     return {
         "status": overall_status,
         "checks": checks,
-        "timestamp": datetime.now(timezone.utc).isoformat(),
-    }
-
-
-@router.get("/startup")
-async def startup_check() -> Dict[str, Any]:
-    """
-    Startup check endpoint for Kubernetes startup probe.
-    
-    Returns:
-        dict: Startup status
-    """
-    # For now, just return healthy since we don't have complex initialization
-    # In the future, this could check if migrations are complete, etc.
-    return {
-        "status": "started",
-        "service": "coins-for-change",
-        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "timestamp": now_iso(),
     }
 
 
@@ -138,51 +97,32 @@ async def detailed_health_check() -> Dict[str, Any]:
     Returns:
         dict: Comprehensive health status including all services and circuit breaker metrics
     """
+    services = await _run_dependency_checks()
+    
+    # Tally service statuses in one pass
+    healthy = degraded = unhealthy = 0
+    for service_health in services.values():
+        service_status = service_health["status"]
+        if service_status == "healthy":
+            healthy += 1
+        elif service_status == "degraded":
+            degraded += 1
+        else:
+            unhealthy += 1
+    
     health_data = {
         "status": "healthy",
-        "timestamp": datetime.now(timezone.utc).isoformat(),
-        "services": {},
+        "timestamp": now_iso(),
+        "services": services,
         "circuit_breakers": {},
         "summary": {
-            "total_services": 0,
-            "healthy_services": 0,
-            "unhealthy_services": 0,
-            "degraded_services": 0
+            "total_services": len(services),
+            "healthy_services": healthy,
+            "unhealthy_services": unhealthy,
+            "degraded_services": degraded
         }
     }
     
-    services_to_check = [
-        ("database", get_database_health),
-        ("redis", get_redis_health),
-        ("opensearch", get_opensearch_health)
-    ]
-    
-    # Check all services
-    for service_name, health_func in services_to_check:
-        try:
-            service_health = await health_func()
-            health_data["services"][service_name] = service_health
-            
-            # Update summary
-            health_data["summary"]["total_services"] += 1
-            if service_health["status"] == "healthy":
-                health_data["summary"]["healthy_services"] += 1
-            elif service_health["status"] == "degraded":
-                health_data["summary"]["degraded_services"] += 1
-            else:
-                health_data["summary"]["unhealthy_services"] += 1
-                health_data["status"] = "unhealthy"
-                
-        except Exception as e:
-            health_data["services"][service_name] = {
-                "status": "unhealthy",
-                "error": str(e)
-            }
-            health_data["summary"]["total_services"] += 1
-            health_data["summary"]["unhealthy_services"] += 1
-            health_data["status"] = "unhealthy"
-            logger.error(f"{service_name} health check failed: {e}")
-    
     # Get circuit breaker metrics
     try:
         health_data["circuit_breakers"] = get_circuit_breaker_metrics()
@@ -191,9 +131,9 @@ async def detailed_health_check() -> Dict[str, Any]:
         health_data["circuit_breakers"] = {"error": str(e)}
     
     # Set overall status based on service health
-    if health_data["summary"]["unhealthy_services"] > 0:
+    if unhealthy:
         health_data["status"] = "unhealthy"
-    elif health_data["summary"]["degraded_services"] > 0:
+    elif degraded:
         health_data["status"] = "degraded"
     
     return health_data
@@ -209,15 +149,27 @@ async def circuit_breaker_status() -> Dict[str, Any]:
     """
     try:
         metrics = get_circuit_breaker_metrics()
+        
+        # Count breaker states in a single pass over the metrics
+        open_breakers = half_open_breakers = closed_breakers = 0
+        for cb in metrics.values():
+            state = cb["state"]
+            if state == "open":
+                open_breakers += 1
+            elif state == "half_open":
+                half_open_breakers += 1
+            elif state == "closed":
+                closed_breakers += 1
+        
         return {
             "status": "success",
-            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "timestamp": now_iso(),
             "circuit_breakers": metrics,
             "summary": {
                 "total_breakers": len(metrics),
-                "open_breakers": sum(1 for cb in metrics.values() if cb["state"] == "open"),
-                "half_open_breakers": sum(1 for cb in metrics.values() if cb["state"] == "half_open"),
-                "closed_breakers": sum(1 for cb in metrics.values() if cb["state"] == "closed")
+                "open_breakers": open_breakers,
+                "half_open_breakers": half_open_breakers,
+                "closed_breakers": closed_breakers
             }
         }
     except Exception as e:
@@ -0,0 +1,139 @@
+"""
+ASGI fast path for Kubernetes liveness and startup probes.
+"""
+import json
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Tuple
+
+from starlette.applications import Starlette
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+Headers = List[Tuple[bytes, bytes]]
+
+# Status reported by each probe path the interceptor can serve
+_PROBE_STATUSES = {
+    "/health": "healthy",
+    "/startup": "started",
+}
+
+# [epoch second, ISO-8601 string] for the last formatted timestamp
+_ts_cache: list = [0, ""]
+
+
+def now_iso() -> str:
+    """
+    Get the current UTC time as an ISO-8601 string at one-second resolution.
+
+    The formatted string is reused until the wall-clock second changes.
+    """
+    now = int(time.time())
+    if now != _ts_cache[0]:
+        _ts_cache[1] = datetime.fromtimestamp(now, timezone.utc).isoformat()
+        _ts_cache[0] = now
+    return _ts_cache[1]
+
+
+def _json_response(
+    body: bytes, *extra_headers: Tuple[bytes, bytes]
+) -> Tuple[Headers, bytes]:
+    """Build the raw header list and body for a static JSON response."""
+    headers = [
+        (b"content-type", b"application/json"),
+        (b"content-length", str(len(body)).encode()),
+        *extra_headers,
+    ]
+    return headers, body
+
+
+_METHOD_NOT_ALLOWED = _json_response(
+    b'{"detail":"Method Not Allowed"}', (b"allow", b"GET")
+)
+
+
+class HealthCheckInterceptor:
+    """
+    Pure ASGI middleware that answers probe paths before the app runs.
+
+    This is the only handler for the probe paths: probe bodies are
+    serialized once at startup and, when mounted with
+    install_health_interceptor, the request never reaches any middleware
+    or the router. With include_timestamp, only the timestamp is filled in
+    per request.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        service_name: str = "coins-for-change",
+        paths: Iterable[str] = ("/health", "/startup"),
+        include_timestamp: bool = False,
+    ):
+        """
+        Initialize the interceptor.
+
+        Args:
+            app: Downstream ASGI application
+            service_name: Service name reported in probe responses
+            paths: Probe paths to answer; each must be /health or /startup
+            include_timestamp: Add the current UTC time to probe responses
+        """
+        self.app = app
+        self._include_timestamp = include_timestamp
+        self._bodies: Dict[str, bytes] = {}
+        for path in paths:
+            body = json.dumps(
+                {"status": _PROBE_STATUSES[path], "service": service_name},
+                separators=(",", ":"),
+            ).encode()
+            if include_timestamp:
+                # Splice a timestamp placeholder in before the closing brace
+                body = body[:-1].replace(b"%", b"%%") + b',"timestamp":"%s"}'
+            self._bodies[path] = body
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Serve probe paths directly and pass everything else through."""
+        if scope["type"] == "http":
+            body = self._bodies.get(scope["path"])
+            if body is not None:
+                if scope["method"] == "GET":
+                    if self._include_timestamp:
+                        body = body % now_iso().encode()
+                    await self._respond(send, 200, *_json_response(body))
+                else:
+                    await self._respond(send, 405, *_METHOD_NOT_ALLOWED)
+                return
+
+        await self.app(scope, receive, send)
+
+    @staticmethod
+    async def _respond(send: Send, status: int, headers: Headers, body: bytes) -> None:
+        """Send a complete response with the given status, headers and body."""
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": headers,
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+def install_health_interceptor(app: Starlette, **options: Any) -> None:
+    """
+    Mount HealthCheckInterceptor outside an application's whole middleware stack.
+
+    app.add_middleware would place it inside ServerErrorMiddleware and inside
+    anything that wraps the built stack, such as OpenTelemetry's FastAPI
+    instrumentation, so probes would still be traced. Wrapping the built
+    stack keeps the interceptor outermost. Call this after instrumenting the
+    app: the instrumentation expects to wrap Starlette's own stack.
+
+    Args:
+        app: Application to mount the interceptor on
+        **options: Keyword arguments for HealthCheckInterceptor
+    """
+    build_middleware_stack = app.build_middleware_stack
+
+    def build_with_interceptor() -> ASGIApp:
+        return HealthCheckInterceptor(build_middleware_stack(), **options)
+
+    app.build_middleware_stack = build_with_interceptor
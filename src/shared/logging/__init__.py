@@ -1,4 +1,4 @@
 # Logging configuration
-from .config import setup_logging, get_logger
+from .config import REQUEST_ID, setup_logging, get_logger
 
-__all__ = ["setup_logging", "get_logger"]
\ No newline at end of file
+__all__ = ["REQUEST_ID", "setup_logging", "get_logger"]
\ No newline at end of file
@@ -1,14 +1,19 @@
 """Structured logging configuration with OpenTelemetry integration."""
 
 import logging
+import os
 import sys
-from typing import Any, Dict
+from contextvars import ContextVar
+from typing import Any, Callable, Dict
 
 import structlog
 from opentelemetry import trace
 
 from src.shared.config import get_settings
 
+# Correlation ID of the request being handled; set by RequestLoggingMiddleware
+REQUEST_ID: ContextVar[str] = ContextVar("request_id", default="")
+
 
 def setup_logging() -> None:
     """Configure structured logging with OpenTelemetry correlation."""
@@ -31,7 +36,7 @@ def setup_logging() -> None:
             structlog.stdlib.add_logger_name,
             structlog.processors.TimeStamper(fmt="iso"),
             # Add service name
-            add_service_context,
+            _make_service_processor(),
             # JSON formatting for production, pretty for development
             structlog.dev.ConsoleRenderer() if settings.debug 
             else structlog.processors.JSONRenderer()
@@ -43,7 +48,11 @@ def setup_logging() -> None:
 
 
 def add_trace_context(logger: Any, method_name: str, event_dict: Dict[str, Any]) -> Dict[str, Any]:
-    """Add OpenTelemetry trace context to log entries."""
+    """Add request ID and OpenTelemetry trace context to log entries."""
+    request_id = REQUEST_ID.get()
+    if request_id:
+        event_dict.setdefault("request_id", request_id)
+    
     span = trace.get_current_span()
     if span:
         span_context = span.get_span_context()
@@ -54,14 +63,16 @@ def add_trace_context(logger: Any, method_name: str, event_dict: Dict[str, Any])
     return event_dict
 
 
-def add_service_context(logger: Any, method_name: str, event_dict: Dict[str, Any]) -> Dict[str, Any]:
-    """Add service context to log entries."""
-    import os
+def _make_service_processor() -> Callable[[Any, str, Dict[str, Any]], Dict[str, Any]]:
+    """Build a processor that adds the service name read once at setup time."""
+    service_name = os.environ.get("SERVICE_NAME", "unknown")
     
-    service_name = os.getenv("SERVICE_NAME", "unknown")
-    event_dict["service"] = service_name
+    def add_service_context(logger: Any, method_name: str, event_dict: Dict[str, Any]) -> Dict[str, Any]:
+        """Add service context to log entries."""
+        event_dict["service"] = service_name
+        return event_dict
     
-    return event_dict
+    return add_service_context
 
 
 def get_logger(name: str) -> structlog.stdlib.BoundLogger:
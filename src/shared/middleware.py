@@ -1,112 +1,179 @@
 """Common middleware for FastAPI applications."""
 
+import logging
 import time
-import uuid
-from typing import Callable
+from os import urandom
 
-from fastapi import FastAPI, Request, Response
-from fastapi.middleware.base import BaseHTTPMiddleware
+from fastapi import FastAPI
 from opentelemetry import trace
 from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
+from starlette.datastructures import URL, Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
-from src.shared.logging.config import get_logger
+from src.shared.config import get_settings
+from src.shared.health_interceptor import install_health_interceptor
+from src.shared.logging.config import REQUEST_ID, get_logger
 
 logger = get_logger(__name__)
 
+# Probe and monitoring endpoints that are too frequent to log per hit
+_UNLOGGED_PATHS = frozenset({
+    "/health",
+    "/ready",
+    "/startup",
+    "/health/detailed",
+    "/health/circuit-breakers",
+})
 
-class RequestLoggingMiddleware(BaseHTTPMiddleware):
-    """Middleware for logging HTTP requests and responses."""
+
+def _new_request_id() -> str:
+    """
+    Get a correlation ID for the current request.
+    
+    Reuses the active OpenTelemetry trace ID when the request is traced,
+    so logs carry a single identifier; otherwise generates a random one.
+    """
+    span_context = trace.get_current_span().get_span_context()
+    if span_context.is_valid:
+        return format(span_context.trace_id, "032x")
+    return urandom(16).hex()
+
+
+class RequestLoggingMiddleware:
+    """Pure ASGI middleware for logging HTTP requests and responses."""
     
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """Process request and log details."""
-        # Generate request ID
-        request_id = str(uuid.uuid4())
-        request.state.request_id = request_id
-        
-        # Start timing
-        start_time = time.time()
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
         
-        # Log request
-        logger.info(
-            "Request started",
-            method=request.method,
-            url=str(request.url),
-            request_id=request_id,
-            user_agent=request.headers.get("user-agent"),
-            client_ip=request.client.host if request.client else None,
-        )
-        
-        # Process request
+        # Generate request ID
+        request_id = _new_request_id()
+        # Bind the ID for every log record emitted while handling this request
+        token = REQUEST_ID.set(request_id)
         try:
-            response = await call_next(request)
+            method = scope["method"]
+            log_request = scope["path"] not in _UNLOGGED_PATHS
+            url = str(URL(scope=scope)) if log_request else None
             
-            # Calculate duration
-            duration = time.time() - start_time
+            # Start timing
+            start_time = time.time()
             
-            # Log response
-            logger.info(
-                "Request completed",
-                method=request.method,
-                url=str(request.url),
-                status_code=response.status_code,
-                duration_ms=round(duration * 1000, 2),
-                request_id=request_id,
-            )
+            # Log request start only when debugging; completion is logged below
+            if log_request and logger.isEnabledFor(logging.DEBUG):
+                client = scope.get("client")
+                logger.debug(
+                    "Request started",
+                    method=method,
+                    url=url,
+                    user_agent=Headers(scope=scope).get("user-agent"),
+                    client_ip=client[0] if client else None,
+                )
+            
+            status_code = None
             
-            # Add request ID to response headers
-            response.headers["X-Request-ID"] = request_id
+            async def send_wrapper(message: Message) -> None:
+                nonlocal status_code
+                if message["type"] == "http.response.start":
+                    status_code = message["status"]
+                    # Add request ID to response headers
+                    MutableHeaders(scope=message).append("X-Request-ID", request_id)
+                await send(message)
             
-            return response
+            # Process request
+            try:
+                await self.app(scope, receive, send_wrapper)
+            
+            except Exception as e:
+                # Calculate duration
+                duration = time.time() - start_time
+                
+                # Log error
+                logger.error(
+                    "Request failed",
+                    method=method,
+                    url=url or str(URL(scope=scope)),
+                    duration_ms=round(duration * 1000, 2),
+                    error=str(e),
+                    exc_info=True,
+                )
+                
+                raise
+            
+            if not log_request:
+                return
             
-        except Exception as e:
             # Calculate duration
             duration = time.time() - start_time
             
-            # Log error
-            logger.error(
-                "Request failed",
-                method=request.method,
-                url=str(request.url),
+            # Log response
+            logger.info(
+                "Request completed",
+                method=method,
+                url=url,
+                status_code=status_code,
                 duration_ms=round(duration * 1000, 2),
-                request_id=request_id,
-                error=str(e),
-                exc_info=True,
             )
-            
-            raise
+        finally:
+            REQUEST_ID.reset(token)
 
 
-class SecurityHeadersMiddleware(BaseHTTPMiddleware):
-    """Middleware for adding security headers."""
+class SecurityHeadersMiddleware:
+    """Pure ASGI middleware for adding security headers."""
     
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+    # Pre-encoded (lowercase name, value) pairs appended to every response
+    _HEADERS = (
+        (b"x-content-type-options", b"nosniff"),
+        (b"x-frame-options", b"DENY"),
+        (b"x-xss-protection", b"1; mode=block"),
+        (b"referrer-policy", b"strict-origin-when-cross-origin"),
+        (
+            b"content-security-policy",
+            b"default-src 'self'; "
+            b"script-src 'self' 'unsafe-inline'; "
+            b"style-src 'self' 'unsafe-inline'; "
+            b"img-src 'self' data: https:; "
+            b"font-src 'self'; "
+            b"connect-src 'self'; "
+            b"frame-ancestors 'none';",
+        ),
+    )
+    
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """Add security headers to response."""
-        response = await call_next(request)
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
         
-        # Add security headers
-        response.headers["X-Content-Type-Options"] = "nosniff"
-        response.headers["X-Frame-Options"] = "DENY"
-        response.headers["X-XSS-Protection"] = "1; mode=block"
-        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
-        response.headers["Content-Security-Policy"] = (
-            "default-src 'self'; "
-            "script-src 'self' 'unsafe-inline'; "
-            "style-src 'self' 'unsafe-inline'; "
-            "img-src 'self' data: https:; "
-            "font-src 'self'; "
-            "connect-src 'self'; "
-            "frame-ancestors 'none';"
-        )
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                # Add security headers
+                MutableHeaders(scope=message).raw.extend(self._HEADERS)
+            await send(message)
         
-        return response
+        await self.app(scope, receive, send_wrapper)
 
 
-def setup_middleware(app: FastAPI) -> None:
+def setup_middleware(app: FastAPI, service_name: str = "coins-for-change") -> None:
     """Setup common middleware for the FastAPI application."""
     
     # Add custom middleware
     app.add_middleware(RequestLoggingMiddleware)
     app.add_middleware(SecurityHeadersMiddleware)
     
-    # Setup OpenTelemetry instrumentation
-    FastAPIInstrumentor.instrument_app(app)
\ No newline at end of file
+    # Setup OpenTelemetry instrumentation; skipped under test, where nothing
+    # collects spans and each of the service apps would pay for the setup
+    if get_settings().environment != "testing":
+        FastAPIInstrumentor.instrument_app(app)
+    
+    # Answer the liveness probe outside every other layer, tracing and CORS
+    # included; services expose no startup probe, so only /health is
+    # intercepted. Must come after instrumentation to stay outermost.
+    install_health_interceptor(app, service_name=service_name, paths=("/health",))
\ No newline at end of file
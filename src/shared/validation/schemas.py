@@ -1,21 +1,26 @@
 """Common Pydantic schemas and validation utilities."""
 
-from datetime import datetime
-from typing import Any, Dict, List, Optional
+import re
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Literal, Optional
 from uuid import UUID
 
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, ConfigDict, EmailStr, Field
+
+# \Z rather than $ so a trailing newline is not accepted
+_EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}\Z')
+
+
+def _utcnow() -> datetime:
+    """Get the current time as a timezone-aware UTC datetime."""
+    return datetime.now(timezone.utc)
 
 
 class BaseResponse(BaseModel):
     """Base response model with common fields."""
     
-    class Config:
-        from_attributes = True
-        json_encoders = {
-            datetime: lambda v: v.isoformat(),
-            UUID: lambda v: str(v)
-        }
+    # datetime and UUID already serialize to ISO 8601 / str in JSON mode
+    model_config = ConfigDict(from_attributes=True)
 
 
 class PaginationParams(BaseModel):
@@ -23,7 +28,7 @@ class PaginationParams(BaseModel):
     page: int = Field(1, ge=1, description="Page number (1-based)")
     size: int = Field(20, ge=1, le=100, description="Items per page")
     sort: Optional[str] = Field(None, description="Sort field")
-    order: Optional[str] = Field("asc", regex="^(asc|desc)$", description="Sort order")
+    order: Optional[Literal["asc", "desc"]] = Field("asc", description="Sort order")
 
 
 class PaginationInfo(BaseModel):
@@ -47,7 +52,7 @@ class ErrorResponse(BaseModel):
     error_code: str = Field(..., description="Machine-readable error code")
     message: str = Field(..., description="Human-readable error message")
     details: Optional[Dict[str, Any]] = Field(None, description="Additional error details")
-    timestamp: datetime = Field(default_factory=datetime.utcnow)
+    timestamp: datetime = Field(default_factory=_utcnow)
     request_id: Optional[str] = Field(None, description="Unique request identifier")
 
 
@@ -55,7 +60,7 @@ class HealthResponse(BaseModel):
     """Health check response."""
     status: str = Field(..., description="Service status")
     service: str = Field(..., description="Service name")
-    timestamp: datetime = Field(default_factory=datetime.utcnow)
+    timestamp: datetime = Field(default_factory=_utcnow)
     checks: Optional[Dict[str, str]] = Field(None, description="Detailed health checks")
 
 
@@ -63,7 +68,7 @@ class UserSummary(BaseModel):
     """User summary for references in other models."""
     id: UUID
     name: str
-    email: str
+    email: EmailStr
 
 
 def validate_uuid(v: str) -> UUID:
@@ -83,9 +88,6 @@ def validate_non_empty_string(v: str) -> str:
 
 def validate_email_format(v: str) -> str:
     """Basic email format validation."""
-    import re
-    
-    email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    if not re.match(email_pattern, v):
+    if not _EMAIL_RE.match(v):
         raise ValueError("Invalid email format")
     return v.lower()
\ No newline at end of file
@@ -1,27 +1,77 @@
 """Pytest configuration and shared fixtures."""
 
 import asyncio
+import inspect
 import os
-from typing import AsyncGenerator, Generator
+import sys
+from pathlib import Path
+from typing import AsyncGenerator
 
+import asyncpg
 import pytest
 import pytest_asyncio
-from fastapi.testclient import TestClient
-from sqlalchemy.ext.asyncio import AsyncSession
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession
+
+try:
+    import uvloop
+except ImportError:  # Not available on Windows
+    uvloop = None
+
+# Make the top-level packages under src/ importable once for every test module
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
 # Set test environment
 os.environ["ENVIRONMENT"] = "testing"
 
 from src.shared.config import get_settings
-from src.shared.database.connection import get_db_session
+
+# Under pytest-xdist each worker gets an equal share of the pool, so parallel
+# workers do not oversubscribe the database; data isolation comes from each
+# worker's session-wide transaction being rolled back
+_xdist_worker_count = int(os.environ.get("PYTEST_XDIST_WORKER_COUNT", "1"))
+if _xdist_worker_count > 1 and "DATABASE_POOL_SIZE" not in os.environ:
+    os.environ["DATABASE_POOL_SIZE"] = str(
+        max(1, get_settings().database_pool_size // _xdist_worker_count)
+    )
+    get_settings.cache_clear()
+
+from src.shared.auth.utils import get_password_hash
+from src.shared.database.connection import close_database, get_async_engine
+
+
+async def _probe_database(timeout: float = 1.0) -> bool:
+    """Check once whether the test database accepts connections."""
+    dsn = get_settings().database_url.replace("+asyncpg", "", 1)
+    try:
+        conn = await asyncio.wait_for(asyncpg.connect(dsn), timeout)
+    except (OSError, asyncio.TimeoutError, asyncpg.PostgresError):
+        return False
+    await conn.close()
+    return True
+
+
+def pytest_collection_modifyitems(items):
+    """Run async tests on the session loop and skip db tests when no server is up."""
+    session_loop = pytest.mark.asyncio(loop_scope="session")
+    for item in items:
+        if inspect.iscoroutinefunction(getattr(item, "function", None)):
+            item.add_marker(session_loop, append=False)
+    
+    # Probe once at collection instead of letting every test time out on connect
+    db_items = [item for item in items if item.get_closest_marker("db")]
+    if db_items and not asyncio.run(_probe_database()):
+        skip_db = pytest.mark.skip(reason="Database not available for integration test")
+        for item in db_items:
+            item.add_marker(skip_db)
 
 
 @pytest.fixture(scope="session")
-def event_loop() -> Generator[asyncio.AbstractEventLoop, None, None]:
-    """Create an instance of the default event loop for the test session."""
-    loop = asyncio.get_event_loop_policy().new_event_loop()
-    yield loop
-    loop.close()
+def event_loop_policy() -> asyncio.AbstractEventLoopPolicy:
+    """Run the session event loop on uvloop where it is installed."""
+    if uvloop is not None:
+        return uvloop.EventLoopPolicy()
+    return asyncio.DefaultEventLoopPolicy()
 
 
 @pytest.fixture
@@ -30,57 +80,101 @@ def settings():
     return get_settings()
 
 
+@pytest.fixture(scope="session")
+def hashed_password() -> str:
+    """Hash the shared test password once per session."""
+    return get_password_hash("test_password_123")
+
+
+@pytest_asyncio.fixture(scope="session")
+async def engine() -> AsyncGenerator[AsyncEngine, None]:
+    """Get the application engine, whose pool is shared by the whole test session."""
+    yield get_async_engine()
+    await close_database()
+
+
+@pytest_asyncio.fixture(scope="session")
+async def connection(engine: AsyncEngine) -> AsyncGenerator[AsyncConnection, None]:
+    """Get one connection whose outer transaction is rolled back after the session."""
+    async with engine.connect() as conn:
+        transaction = await conn.begin()
+        try:
+            yield conn
+        finally:
+            await transaction.rollback()
+
+
 @pytest_asyncio.fixture
-async def db_session() -> AsyncGenerator[AsyncSession, None]:
-    """Get a database session for testing."""
-    async with get_db_session() as session:
+async def db_session(connection: AsyncConnection) -> AsyncGenerator[AsyncSession, None]:
+    """Get a database session whose work is discarded with a savepoint after the test."""
+    session = AsyncSession(
+        bind=connection,
+        expire_on_commit=False,
+        join_transaction_mode="create_savepoint",
+    )
+    try:
         yield session
+    finally:
+        # Closing rolls back the session's savepoint, leaving the outer transaction open
+        await session.close()
 
 
-@pytest.fixture
-def auth_client():
+def _asgi_client(app) -> AsyncClient:
+    """Build an async client that calls the ASGI app in-process on the test loop."""
+    return AsyncClient(transport=ASGITransport(app=app), base_url="http://test")
+
+
+@pytest_asyncio.fixture(scope="session")
+async def auth_client() -> AsyncGenerator[AsyncClient, None]:
     """Get a test client for the auth service."""
     from src.services.auth.main import app
-    return TestClient(app)
+    async with _asgi_client(app) as client:
+        yield client
 
 
-@pytest.fixture
-def campaigns_client():
+@pytest_asyncio.fixture(scope="session")
+async def campaigns_client() -> AsyncGenerator[AsyncClient, None]:
     """Get a test client for the campaigns service."""
     from src.services.campaigns.main import app
-    return TestClient(app)
+    async with _asgi_client(app) as client:
+        yield client
 
 
-@pytest.fixture
-def ideas_client():
+@pytest_asyncio.fixture(scope="session")
+async def ideas_client() -> AsyncGenerator[AsyncClient, None]:
     """Get a test client for the ideas service."""
     from src.services.ideas.main import app
-    return TestClient(app)
+    async with _asgi_client(app) as client:
+        yield client
 
 
-@pytest.fixture
-def coins_client():
+@pytest_asyncio.fixture(scope="session")
+async def coins_client() -> AsyncGenerator[AsyncClient, None]:
     """Get a test client for the coins service."""
     from src.services.coins.main import app
-    return TestClient(app)
+    async with _asgi_client(app) as client:
+        yield client
 
 
-@pytest.fixture
-def search_client():
+@pytest_asyncio.fixture(scope="session")
+async def search_client() -> AsyncGenerator[AsyncClient, None]:
     """Get a test client for the search service."""
     from src.services.search.main import app
-    return TestClient(app)
+    async with _asgi_client(app) as client:
+        yield client
 
 
-@pytest.fixture
-def notifications_client():
+@pytest_asyncio.fixture(scope="session")
+async def notifications_client() -> AsyncGenerator[AsyncClient, None]:
     """Get a test client for the notifications service."""
     from src.services.notifications.main import app
-    return TestClient(app)
+    async with _asgi_client(app) as client:
+        yield client
 
 
-@pytest.fixture
-def analytics_client():
+@pytest_asyncio.fixture(scope="session")
+async def analytics_client() -> AsyncGenerator[AsyncClient, None]:
     """Get a test client for the analytics service."""
     from src.services.analytics.main import app
-    return TestClient(app)
\ No newline at end of file
+    async with _asgi_client(app) as client:
+        yield client
\ No newline at end of file
@@ -1,73 +1,71 @@
 """Test service health endpoints."""
 
+import asyncio
+
 import pytest
+from jsonschema import Draft202012Validator
 
+SERVICES = [
+    "auth",
+    "campaigns",
+    "ideas",
+    "coins",
+    "search",
+    "notifications",
+    "analytics",
+]
 
-@pytest.mark.integration
-def test_auth_service_health(auth_client):
-    """Test auth service health endpoint."""
-    response = auth_client.get("/health")
-    assert response.status_code == 200
-    data = response.json()
-    assert data["status"] == "healthy"
-    assert data["service"] == "auth"
+HEALTH_SCHEMA = {
+    "type": "object",
+    "required": ["status", "service"],
+    "properties": {
+        "status": {"const": "healthy"},
+        "service": {"enum": SERVICES},
+    },
+}
 
 
-@pytest.mark.integration
-def test_campaigns_service_health(campaigns_client):
-    """Test campaigns service health endpoint."""
-    response = campaigns_client.get("/health")
-    assert response.status_code == 200
-    data = response.json()
-    assert data["status"] == "healthy"
-    assert data["service"] == "campaigns"
+@pytest.fixture(scope="session")
+def health_validator():
+    """Compile the health response schema once per session."""
+    Draft202012Validator.check_schema(HEALTH_SCHEMA)
+    return Draft202012Validator(HEALTH_SCHEMA)
 
 
-@pytest.mark.integration
-def test_ideas_service_health(ideas_client):
-    """Test ideas service health endpoint."""
-    response = ideas_client.get("/health")
-    assert response.status_code == 200
-    data = response.json()
-    assert data["status"] == "healthy"
-    assert data["service"] == "ideas"
+@pytest.fixture
+def service_client(request, service):
+    """Get the client for the parametrized service."""
+    # Resolve the client lazily so -k filters only import the selected services
+    return request.getfixturevalue(f"{service}_client")
 
 
-@pytest.mark.integration
-def test_coins_service_health(coins_client):
-    """Test coins service health endpoint."""
-    response = coins_client.get("/health")
-    assert response.status_code == 200
-    data = response.json()
-    assert data["status"] == "healthy"
-    assert data["service"] == "coins"
+@pytest.fixture
+def service_clients(request):
+    """Get the clients for every service, keyed by service name."""
+    return {service: request.getfixturevalue(f"{service}_client") for service in SERVICES}
 
 
-@pytest.mark.integration
-def test_search_service_health(search_client):
-    """Test search service health endpoint."""
-    response = search_client.get("/health")
+def _assert_healthy(validator, response, service):
+    """Check a health response reports the given service as healthy."""
     assert response.status_code == 200
     data = response.json()
-    assert data["status"] == "healthy"
-    assert data["service"] == "search"
+    validator.validate(data)
+    assert data["service"] == service
 
 
 @pytest.mark.integration
-def test_notifications_service_health(notifications_client):
-    """Test notifications service health endpoint."""
-    response = notifications_client.get("/health")
-    assert response.status_code == 200
-    data = response.json()
-    assert data["status"] == "healthy"
-    assert data["service"] == "notifications"
+@pytest.mark.parametrize("service", SERVICES)
+async def test_service_health(service, service_client, health_validator):
+    """Test each service's health endpoint."""
+    response = await service_client.get("/health")
+    _assert_healthy(health_validator, response, service)
 
 
 @pytest.mark.integration
-def test_analytics_service_health(analytics_client):
-    """Test analytics service health endpoint."""
-    response = analytics_client.get("/health")
-    assert response.status_code == 200
-    data = response.json()
-    assert data["status"] == "healthy"
-    assert data["service"] == "analytics"
\ No newline at end of file
+async def test_all_services_health_concurrently(service_clients, health_validator):
+    """Test that all services answer health checks issued concurrently."""
+    responses = await asyncio.gather(
+        *(client.get("/health") for client in service_clients.values())
+    )
+    for service, response in zip(service_clients, responses):
+        _assert_healthy(health_validator, response, service)
@@ -1,41 +1,48 @@
 """Test authentication utilities."""
 
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 
 import pytest
+from freezegun import freeze_time
 
 from src.shared.auth.utils import (
     create_access_token,
-    get_password_hash,
     validate_password_strength,
     verify_password,
     verify_token,
 )
+from src.shared.config import get_settings
 
+FROZEN_NOW = datetime(2024, 1, 1, tzinfo=timezone.utc)
 
-def test_password_hashing():
+
+def test_password_hashing(hashed_password):
     """Test password hashing and verification."""
     password = "test_password_123"
-    hashed = get_password_hash(password)
     
-    assert hashed != password
-    assert verify_password(password, hashed) is True
-    assert verify_password("wrong_password", hashed) is False
+    assert hashed_password != password
+    assert hashed_password.startswith("$2b$04$")
+    assert verify_password(password, hashed_password) is True
+    assert verify_password("wrong_password", hashed_password) is False
 
 
-def test_password_strength_validation():
+@pytest.mark.parametrize(
+    "password,expected",
+    [
+        ("Password123", True),
+        ("MySecure1Pass", True),
+        ("short", False),  # Too short
+        ("alllowercase123", False),  # No uppercase
+        ("ALLUPPERCASE123", False),  # No lowercase
+        ("NoNumbers", False),  # No digits
+    ],
+)
+def test_password_strength_validation(password, expected):
     """Test password strength validation."""
-    # Valid passwords
-    assert validate_password_strength("Password123") is True
-    assert validate_password_strength("MySecure1Pass") is True
-    
-    # Invalid passwords
-    assert validate_password_strength("short") is False  # Too short
-    assert validate_password_strength("alllowercase123") is False  # No uppercase
-    assert validate_password_strength("ALLUPPERCASE123") is False  # No lowercase
-    assert validate_password_strength("NoNumbers") is False  # No digits
+    assert validate_password_strength(password) is expected
 
 
+@freeze_time(FROZEN_NOW)
 def test_jwt_token_creation_and_verification():
     """Test JWT token creation and verification."""
     data = {"sub": "test_user", "email": "test@example.com"}
@@ -49,9 +56,11 @@ def test_jwt_token_creation_and_verification():
     assert payload is not None
     assert payload["sub"] == "test_user"
     assert payload["email"] == "test@example.com"
-    assert "exp" in payload
+    expected_exp = FROZEN_NOW + timedelta(seconds=get_settings().jwt_expiration_seconds)
+    assert payload["exp"] == int(expected_exp.timestamp())
 
 
+@freeze_time(FROZEN_NOW)
 def test_jwt_token_with_custom_expiration():
     """Test JWT token with custom expiration."""
     data = {"sub": "test_user"}
@@ -61,13 +70,8 @@ def test_jwt_token_with_custom_expiration():
     payload = verify_token(token)
     assert payload is not None
     
-    # Check expiration is approximately 30 minutes from now
-    exp_timestamp = payload["exp"]
-    exp_datetime = datetime.fromtimestamp(exp_timestamp)
-    expected_exp = datetime.utcnow() + expires_delta
-    
-    # Allow 1 minute tolerance
-    assert abs((exp_datetime - expected_exp).total_seconds()) < 60
+    # With the clock frozen the expiration is exact
+    assert payload["exp"] == int((FROZEN_NOW + expires_delta).timestamp())
 
 
 def test_invalid_jwt_token():
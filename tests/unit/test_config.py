@@ -1,32 +1,39 @@
 """Test configuration management."""
 
-import os
 import pytest
 
 from src.shared.config import get_settings, DevelopmentSettings, ProductionSettings, TestingSettings
 
 
-def test_get_settings_development():
+@pytest.fixture(autouse=True)
+def _reset_settings():
+    """Build settings from each test's environment and drop them afterwards."""
+    get_settings.cache_clear()
+    yield
+    get_settings.cache_clear()
+
+
+def test_get_settings_development(monkeypatch):
     """Test getting development settings."""
-    os.environ["ENVIRONMENT"] = "development"
+    monkeypatch.setenv("ENVIRONMENT", "development")
     settings = get_settings()
     assert isinstance(settings, DevelopmentSettings)
     assert settings.debug is True
     assert settings.log_level == "DEBUG"
 
 
-def test_get_settings_production():
+def test_get_settings_production(monkeypatch):
     """Test getting production settings."""
-    os.environ["ENVIRONMENT"] = "production"
+    monkeypatch.setenv("ENVIRONMENT", "production")
     settings = get_settings()
     assert isinstance(settings, ProductionSettings)
     assert settings.debug is False
     assert settings.log_level == "INFO"
 
 
-def test_get_settings_testing():
+def test_get_settings_testing(monkeypatch):
     """Test getting testing settings."""
-    os.environ["ENVIRONMENT"] = "testing"
+    monkeypatch.setenv("ENVIRONMENT", "testing")
     settings = get_settings()
     assert isinstance(settings, TestingSettings)
     assert settings.debug is True
@@ -34,9 +41,9 @@ def test_get_settings_testing():
     assert "test" in settings.database_url
 
 
-def test_cors_origins_parsing():
+def test_cors_origins_parsing(monkeypatch):
     """Test CORS origins parsing from string."""
-    os.environ["CORS_ORIGINS"] = "http://localhost:3000,http://localhost:8080"
+    monkeypatch.setenv("CORS_ORIGINS", "http://localhost:3000,http://localhost:8080")
     settings = get_settings()
     assert len(settings.cors_origins) == 2
     assert "http://localhost:3000" in settings.cors_origins
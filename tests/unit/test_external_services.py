@@ -1,146 +1,196 @@
 """Unit tests for external service resilience components."""
 
 import asyncio
+import importlib
+import itertools
+import socket
+import time
 import pytest
-from unittest.mock import AsyncMock, MagicMock, patch
+import pytest_asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
 
-# Import the modules directly to avoid dependency issues in tests
-import sys
-from pathlib import Path
-sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
-
-from src.shared.external.circuit_breaker import CircuitBreaker, CircuitBreakerError, CircuitBreakerState
-from src.shared.external.retry import RetryManager, RetryError
+from src.shared.external.circuit_breaker import (
+    CircuitBreaker,
+    CircuitBreakerError,
+    CircuitBreakerState,
+    circuit_breaker,
+)
+from src.shared.external.retry import RetryManager, RetryError, with_retry
 from src.shared.external.monitoring import ServiceMonitor, AlertSeverity
+from src.shared.external.service_discovery import (
+    KubernetesServiceDiscovery,
+    ServiceDiscovery,
+    ServiceEndpoint,
+    ServiceRegistry,
+    StaticServiceDiscovery,
+)
 
+# State value reported in breaker metrics
+_CLOSED = CircuitBreakerState.CLOSED.value
 
-class TestCircuitBreaker:
-    """Test circuit breaker functionality."""
+# The package re-exports the circuit_breaker decorator under the module's name
+circuit_breaker_module = importlib.import_module("src.shared.external.circuit_breaker")
+retry_module = importlib.import_module("src.shared.external.retry")
+service_discovery_module = importlib.import_module(
+    "src.shared.external.service_discovery"
+)
+
+
+@pytest.fixture
+def advance(monkeypatch):
+    """
+    Run circuit breaker timing on a fake clock.
     
-    @pytest.mark.asyncio
-    async def test_successful_calls(self):
-        """Test that successful calls work normally."""
-        cb = CircuitBreaker("test", fail_max=3)
-        
-        async def success_func():
-            return "success"
-        
-        result = await cb.call(success_func)
-        assert result == "success"
-        assert cb.state == CircuitBreakerState.CLOSED
-        assert cb.fail_counter == 0
-        assert cb.success_counter == 0  # Only incremented in half-open state
+    Returns a coroutine function that advances the clock by the given seconds.
+    """
+    clock = [0.0]
+    monkeypatch.setattr(
+        circuit_breaker_module, "time", SimpleNamespace(time=lambda: clock[0])
+    )
+    real_sleep = asyncio.sleep
     
-    @pytest.mark.asyncio
-    async def test_circuit_opens_after_failures(self):
-        """Test that circuit opens after max failures."""
-        cb = CircuitBreaker("test", fail_max=2)
-        
-        async def fail_func():
-            raise Exception("Test failure")
-        
-        # First failure
-        with pytest.raises(Exception, match="Test failure"):
-            await cb.call(fail_func)
-        assert cb.state == CircuitBreakerState.CLOSED
-        assert cb.fail_counter == 1
-        
-        # Second failure - should open circuit
-        with pytest.raises(Exception, match="Test failure"):
-            await cb.call(fail_func)
-        assert cb.state == CircuitBreakerState.OPEN
-        assert cb.fail_counter == 2
-        
-        # Third call should be blocked
-        with pytest.raises(CircuitBreakerError):
-            await cb.call(fail_func)
+    async def advance_clock(seconds: float) -> None:
+        clock[0] += seconds
+        await real_sleep(0)
     
-    @pytest.mark.asyncio
-    async def test_circuit_reset_after_timeout(self):
-        """Test that circuit resets after timeout."""
-        cb = CircuitBreaker("test", fail_max=1, reset_timeout=0.1)
-        
-        async def fail_func():
-            raise Exception("Test failure")
-        
-        async def success_func():
-            return "success"
-        
-        # Trigger failure to open circuit
-        with pytest.raises(Exception):
-            await cb.call(fail_func)
-        assert cb.state == CircuitBreakerState.OPEN
-        
-        # Wait for reset timeout
-        await asyncio.sleep(0.15)
-        
-        # Should transition to half-open and allow call
-        result = await cb.call(success_func)
-        assert result == "success"
-        assert cb.state == CircuitBreakerState.CLOSED
+    return advance_clock
+
+
+class BusinessError(Exception):
+    """Application error that circuit breakers are configured to ignore."""
+
+
+async def _success():
+    return "ok"
+
+
+async def _fail():
+    raise RuntimeError("Test failure")
+
+
+async def _business_error():
+    raise BusinessError("Business logic error")
+
+
+# (id, breaker kwargs, operations, expected (state, fail_counter, success_counter)).
+# "ok"/"fail"/"business" call the breaker and expect that outcome, "fail_pair"
+# makes two failing calls concurrently, "blocked" expects CircuitBreakerError,
+# and "wait" advances past the reset timeout.
+CB_CASES = [
+    ("successful_calls", {"fail_max": 3}, ["ok"], (CircuitBreakerState.CLOSED, 0, 0)),
+    ("below_fail_max", {"fail_max": 2}, ["fail"], (CircuitBreakerState.CLOSED, 1, 0)),
+    (
+        "opens_after_failures",
+        {"fail_max": 2, "reset_timeout": 0.1},
+        ["fail_pair", "blocked"],
+        (CircuitBreakerState.OPEN, 2, 0),
+    ),
+    (
+        "reset_after_timeout",
+        {"fail_max": 1, "reset_timeout": 0.1},
+        ["fail", "wait", "ok"],
+        (CircuitBreakerState.CLOSED, 0, 0),
+    ),
+    (
+        "half_open_below_success_threshold",
+        {"fail_max": 1, "reset_timeout": 0.1, "success_threshold": 2},
+        ["fail", "wait", "ok"],
+        (CircuitBreakerState.HALF_OPEN, 1, 1),
+    ),
+    (
+        "half_open_success_threshold",
+        {"fail_max": 1, "reset_timeout": 0.1, "success_threshold": 2},
+        ["fail", "wait", "ok", "ok"],
+        (CircuitBreakerState.CLOSED, 0, 0),
+    ),
+    (
+        "excluded_exceptions",
+        {"fail_max": 1, "excluded_exceptions": [BusinessError]},
+        ["business"],
+        (CircuitBreakerState.CLOSED, 0, 0),
+    ),
+]
+
+
+@pytest.fixture
+def cb():
+    """Build "test" circuit breakers from shared defaults plus per-test overrides."""
+    def make(**kwargs):
+        return CircuitBreaker(
+            "test",
+            **{
+                "fail_max": 3,
+                "reset_timeout": 0.0,
+                **kwargs,
+            },
+        )
     
-    @pytest.mark.asyncio
-    async def test_half_open_success_threshold(self):
-        """Test success threshold in half-open state."""
-        cb = CircuitBreaker("test", fail_max=1, reset_timeout=0.1, success_threshold=2)
-        
-        async def fail_func():
-            raise Exception("Test failure")
-        
-        async def success_func():
-            return "success"
-        
-        # Open circuit
-        with pytest.raises(Exception):
-            await cb.call(fail_func)
-        
-        # Wait for reset
-        await asyncio.sleep(0.15)
-        
-        # First success in half-open
-        await cb.call(success_func)
-        assert cb.state == CircuitBreakerState.HALF_OPEN
-        assert cb.success_counter == 1
-        
-        # Second success should close circuit
-        await cb.call(success_func)
-        assert cb.state == CircuitBreakerState.CLOSED
-        assert cb.success_counter == 0  # Reset on state change
+    return make
+
+
+class TestCircuitBreaker:
+    """Test circuit breaker functionality."""
     
     @pytest.mark.asyncio
-    async def test_excluded_exceptions(self):
-        """Test that excluded exceptions don't count as failures."""
-        class BusinessError(Exception):
-            pass
-        
-        cb = CircuitBreaker("test", fail_max=1, excluded_exceptions=[BusinessError])
-        
-        async def business_error_func():
-            raise BusinessError("Business logic error")
-        
-        # Business error should not count as failure
-        with pytest.raises(BusinessError):
-            await cb.call(business_error_func)
-        
-        assert cb.state == CircuitBreakerState.CLOSED
-        assert cb.fail_counter == 0
+    @pytest.mark.parametrize("case", CB_CASES, ids=lambda case: case[0])
+    async def test_cb_state_machine(self, case, advance, cb):
+        """Test breaker state transitions for a sequence of calls."""
+        _, kwargs, operations, expected = case
+        breaker = cb(**kwargs)
+        
+        for operation in operations:
+            if operation == "ok":
+                assert await breaker.call(_success) == "ok"
+            elif operation == "fail":
+                with pytest.raises(RuntimeError, match="Test failure"):
+                    await breaker.call(_fail)
+            elif operation == "fail_pair":
+                results = await asyncio.gather(
+                    breaker.call(_fail), breaker.call(_fail), return_exceptions=True
+                )
+                assert all(isinstance(result, RuntimeError) for result in results)
+            elif operation == "business":
+                with pytest.raises(BusinessError):
+                    await breaker.call(_business_error)
+            elif operation == "blocked":
+                with pytest.raises(CircuitBreakerError):
+                    await breaker.call(_fail)
+            elif operation == "wait":
+                await advance(breaker.reset_timeout)
+        
+        state = (breaker.state, breaker.fail_counter, breaker.success_counter)
+        assert state == expected
     
-    def test_metrics(self):
+    def test_metrics(self, cb):
         """Test circuit breaker metrics."""
-        cb = CircuitBreaker("test", fail_max=5)
-        metrics = cb.metrics
+        metrics = cb(fail_max=5).metrics
         
         assert metrics["name"] == "test"
-        assert metrics["state"] == CircuitBreakerState.CLOSED.value
+        assert metrics["state"] == _CLOSED
         assert metrics["fail_counter"] == 0
         assert metrics["success_counter"] == 0
         assert metrics["total_requests"] == 0
         assert metrics["failure_rate"] == 0.0
 
 
+# Without jitter _calculate_delay is pure, so one manager serves every row
+DELAY_RETRY_MANAGER = RetryManager(
+    base_delay=1.0,
+    max_delay=10.0,
+    exponential_base=2.0,
+    jitter=False
+)
+
+
 class TestRetryManager:
     """Test retry manager functionality."""
     
+    @pytest.fixture
+    def zero_delay_retry(self):
+        """Retry manager with no backoff, for tests not checking the delay formula."""
+        return RetryManager(max_retries=2, base_delay=0.0)
+    
     @pytest.mark.asyncio
     async def test_successful_call_no_retry(self):
         """Test that successful calls don't trigger retries."""
@@ -153,10 +203,8 @@ class TestRetryManager:
         assert result == "success"
     
     @pytest.mark.asyncio
-    async def test_retry_on_failure(self):
+    async def test_retry_on_failure(self, zero_delay_retry):
         """Test retry logic on failures."""
-        retry_manager = RetryManager(max_retries=2, base_delay=0.01)
-        
         call_count = 0
         
         async def fail_then_succeed():
@@ -166,20 +214,18 @@ class TestRetryManager:
                 raise Exception("Temporary failure")
             return "success after retries"
         
-        result = await retry_manager.execute_with_retry(fail_then_succeed)
+        result = await zero_delay_retry.execute_with_retry(fail_then_succeed)
         assert result == "success after retries"
         assert call_count == 3  # Initial + 2 retries
     
     @pytest.mark.asyncio
-    async def test_retry_exhaustion(self):
+    async def test_retry_exhaustion(self, zero_delay_retry):
         """Test behavior when all retries are exhausted."""
-        retry_manager = RetryManager(max_retries=2, base_delay=0.01)
-        
         async def always_fail():
             raise Exception("Always fails")
         
         with pytest.raises(RetryError) as exc_info:
-            await retry_manager.execute_with_retry(always_fail)
+            await zero_delay_retry.execute_with_retry(always_fail)
         
         assert exc_info.value.attempts == 3  # Initial + 2 retries
         assert "Always fails" in str(exc_info.value.last_exception)
@@ -192,7 +238,7 @@ class TestRetryManager:
         
         retry_manager = RetryManager(
             max_retries=3,
-            base_delay=0.01,
+            base_delay=0.0,
             retryable_exceptions=[ConnectionError]
         )
         
@@ -208,37 +254,67 @@ class TestRetryManager:
         
         assert call_count == 1  # Should not retry
     
-    def test_delay_calculation(self):
+    @pytest.mark.parametrize(
+        "attempt, expected",
+        [
+            (0, 1.0),  # 1.0 * 2^0
+            (1, 2.0),  # 1.0 * 2^1
+            (2, 4.0),  # 1.0 * 2^2
+            (10, 10.0),  # Capped at max_delay
+        ],
+    )
+    def test_delay_calculation(self, attempt, expected):
         """Test exponential backoff delay calculation."""
-        retry_manager = RetryManager(
-            base_delay=1.0,
-            max_delay=10.0,
-            exponential_base=2.0,
-            jitter=False
-        )
-        
-        # Test exponential backoff
-        assert retry_manager._calculate_delay(0) == 1.0  # 1.0 * 2^0
-        assert retry_manager._calculate_delay(1) == 2.0  # 1.0 * 2^1
-        assert retry_manager._calculate_delay(2) == 4.0  # 1.0 * 2^2
-        
-        # Test max delay cap
-        assert retry_manager._calculate_delay(10) == 10.0  # Capped at max_delay
+        assert DELAY_RETRY_MANAGER._calculate_delay(attempt) == expected
 
 
 class TestServiceMonitor:
     """Test service monitoring functionality."""
     
+    @pytest_asyncio.fixture
+    async def make_monitor(self):
+        """Build monitors for test_service and stop them after the test."""
+        monitors = []
+        
+        def factory(health_check_func, **kwargs):
+            monitor = ServiceMonitor(
+                service_name="test_service",
+                health_check_func=health_check_func,
+                check_interval=1,
+                **kwargs
+            )
+            monitors.append(monitor)
+            return monitor
+        
+        yield factory
+        
+        # The loop is shared across the session, so no monitoring task may
+        # outlive its test
+        for monitor in monitors:
+            await monitor.stop_monitoring()
+    
     @pytest.mark.asyncio
-    async def test_successful_health_check(self):
+    async def test_monitoring_runs_in_background(self, make_monitor):
+        """Test that started monitoring keeps checking health on the shared loop."""
+        checked = asyncio.Event()
+        
+        async def health_check():
+            checked.set()
+            return {"status": "healthy"}
+        
+        monitor = make_monitor(health_check)
+        monitor.start_monitoring()
+        await asyncio.wait_for(checked.wait(), timeout=1.0)
+        
+        # Still running between checks; the make_monitor teardown stops it
+        assert not monitor._monitoring_task.done()
+    
+    @pytest.mark.asyncio
+    async def test_successful_health_check(self, make_monitor):
         """Test successful health check updates metrics correctly."""
         health_check_mock = AsyncMock(return_value={"status": "healthy"})
         
-        monitor = ServiceMonitor(
-            service_name="test_service",
-            health_check_func=health_check_mock,
-            check_interval=1
-        )
+        monitor = make_monitor(health_check_mock)
         
         # Perform health check
         result = await monitor._perform_health_check()
@@ -252,15 +328,15 @@ class TestServiceMonitor:
         health_check_mock.assert_called_once()
     
     @pytest.mark.asyncio
-    async def test_failed_health_check(self):
+    async def test_failed_health_check(self, make_monitor):
         """Test failed health check updates metrics correctly."""
-        health_check_mock = AsyncMock(side_effect=Exception("Health check failed"))
+        calls = []
         
-        monitor = ServiceMonitor(
-            service_name="test_service",
-            health_check_func=health_check_mock,
-            check_interval=1
-        )
+        async def failing_health_check():
+            calls.append(1)
+            raise Exception("Health check failed")
+        
+        monitor = make_monitor(failing_health_check)
         
         # Perform health check
         result = await monitor._perform_health_check()
@@ -270,43 +346,42 @@ class TestServiceMonitor:
         assert monitor.metrics.success_count == 0
         assert monitor.metrics.error_count == 1
         assert monitor.metrics.consecutive_failures == 1
+        assert len(calls) == 1
     
     @pytest.mark.asyncio
-    async def test_alert_on_failure_threshold(self):
+    async def test_alert_on_failure_threshold(self, make_monitor):
         """Test that alerts are sent when failure threshold is reached."""
-        health_check_mock = AsyncMock(side_effect=Exception("Health check failed"))
+        async def failing_health_check():
+            raise Exception("Health check failed")
         
-        monitor = ServiceMonitor(
-            service_name="test_service",
-            health_check_func=health_check_mock,
-            check_interval=1,
-            failure_threshold=2
-        )
+        monitor = make_monitor(failing_health_check, failure_threshold=2)
         
-        # Mock alert handler
-        alert_handler_mock = AsyncMock()
-        monitor.add_alert_handler(alert_handler_mock)
+        # Count alerts with a plain handler
+        alert_count = 0
+        
+        async def alert_handler(alert):
+            nonlocal alert_count
+            alert_count += 1
+        
+        monitor.add_alert_handler(SimpleNamespace(handle_alert=alert_handler))
         
         # First failure - no alert yet
         await monitor._perform_health_check()
-        assert alert_handler_mock.handle_alert.call_count == 1  # Health status change alert
+        assert alert_count == 1  # Health status change alert
         
         # Second failure - should trigger threshold alert
         await monitor._perform_health_check()
-        assert alert_handler_mock.handle_alert.call_count >= 2
+        assert alert_count >= 2
     
     @pytest.mark.asyncio
-    async def test_response_time_threshold_alert(self):
+    async def test_response_time_threshold_alert(self, make_monitor):
         """Test alert on response time threshold."""
-        # Mock a slow health check
+        # The clock, not the check, makes this call take 200ms
         async def slow_health_check():
-            await asyncio.sleep(0.1)  # 100ms delay
             return {"status": "healthy"}
         
-        monitor = ServiceMonitor(
-            service_name="test_service",
-            health_check_func=slow_health_check,
-            check_interval=1,
+        monitor = make_monitor(
+            slow_health_check,
             response_time_threshold=50.0  # 50ms threshold
         )
         
@@ -315,7 +390,11 @@ class TestServiceMonitor:
         monitor.add_alert_handler(alert_handler_mock)
         
         # Perform health check
-        await monitor._perform_health_check()
+        with patch(
+            "src.shared.external.monitoring.time.perf_counter",
+            side_effect=[0.0, 0.2],
+        ):
+            await monitor._perform_health_check()
         
         # Should have triggered response time alert
         alert_handler_mock.handle_alert.assert_called()
@@ -327,7 +406,8 @@ class TestServiceMonitor:
     
     def test_metrics_collection(self):
         """Test that metrics are collected correctly."""
-        health_check_mock = MagicMock(return_value={"status": "healthy"})
+        def health_check_mock():
+            return {"status": "healthy"}
         
         monitor = ServiceMonitor(
             service_name="test_service",
@@ -347,14 +427,20 @@ class TestServiceMonitor:
 
 
 @pytest.mark.asyncio
-async def test_integration_circuit_breaker_with_retry():
+@pytest.mark.slow
+async def test_integration_circuit_breaker_with_retry(advance, monkeypatch):
     """Test circuit breaker and retry working together."""
-    from src.shared.external.circuit_breaker import circuit_breaker
-    from src.shared.external.retry import with_retry
+    # Retry backoff moves the fake clock instead of waiting in real time; only
+    # the retry module's sleep is replaced, not asyncio.sleep process-wide
+    monkeypatch.setattr(
+        retry_module,
+        "asyncio",
+        SimpleNamespace(iscoroutinefunction=asyncio.iscoroutinefunction, sleep=advance),
+    )
     
     call_count = 0
     
-    @circuit_breaker("integration_test", fail_max=2, reset_timeout=0.1)
+    @circuit_breaker("integration_test", fail_max=1, reset_timeout=0.1)
     @with_retry(max_retries=1, base_delay=0.01)
     async def flaky_function():
         nonlocal call_count
@@ -363,17 +449,385 @@ async def test_integration_circuit_breaker_with_retry():
             raise Exception("Flaky failure")
         return "success"
     
-    # First call: fails, retries, fails again, circuit breaker records 2 failures
+    # First call: fails, retries, fails again; the breaker wraps the retry, so
+    # the exhausted RetryError is the single failure that opens it
     with pytest.raises(RetryError):
         await flaky_function()
+    assert call_count == 2
     
-    # Second call: circuit breaker should be open
+    # Second call: circuit breaker is open and never reaches the function
     with pytest.raises(CircuitBreakerError):
         await flaky_function()
+    assert call_count == 2
     
     # Wait for circuit breaker reset
-    await asyncio.sleep(0.15)
+    await advance(0.15)
     
-    # Third call: should succeed after retry
+    # Third call: half-open trial fails once, then succeeds on retry
     result = await flaky_function()
-    assert result == "success"
\ No newline at end of file
+    assert result == "success"
+
+
+class FakeDiscovery(ServiceDiscovery):
+    """Discovery backend with fixed endpoints and scripted health results."""
+    
+    def __init__(self, endpoints):
+        self.endpoints = endpoints
+        self.results = {}  # port -> bool, or an exception to raise
+        self.checked = []
+    
+    async def discover_endpoints(self, service_name):
+        return list(self.endpoints.get(service_name, []))
+    
+    async def health_check_endpoint(self, endpoint, session=None):
+        self.checked.append(endpoint)
+        result = self.results.get(endpoint.port, True)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+def _pop_due(registry):
+    """Pop every queued health check, as the scheduler does for a due batch."""
+    batch = sorted(registry._due)
+    registry._due.clear()
+    return batch
+
+
+class TestServiceRegistryScheduler:
+    """Test the batched endpoint health check scheduler."""
+    
+    @pytest_asyncio.fixture
+    async def registry(self):
+        """Registry for one service with two endpoints, closed after the test."""
+        discovery = FakeDiscovery({
+            "svc": [
+                ServiceEndpoint("10.0.0.1", 8001),
+                ServiceEndpoint("10.0.0.2", 8002),
+            ]
+        })
+        registry = ServiceRegistry(discovery)
+        registry._health_check_jitter = 0.0
+        await registry._refresh_endpoints("svc")
+        yield registry
+        await registry.close()
+    
+    @pytest.mark.asyncio
+    async def test_new_endpoints_are_due_immediately(self, registry):
+        """Test that discovered endpoints are queued for an immediate check."""
+        assert len(registry._due) == 2
+        assert all(entry[0] <= time.monotonic() for entry in registry._due)
+    
+    @pytest.mark.asyncio
+    async def test_checks_update_health_and_reschedule(self, registry):
+        """Test that a batch updates endpoint health and queues the next check."""
+        registry.discovery.results[8002] = False
+        
+        await registry._run_health_checks(_pop_due(registry))
+        
+        first, second = registry._endpoints_cache["svc"]
+        assert (first.healthy, second.healthy) == (True, False)
+        assert first.last_check > 0.0
+        assert len(registry._due) == 2
+        next_check = time.monotonic() + registry._health_check_interval
+        assert all(entry[0] <= next_check for entry in registry._due)
+        assert all(entry[0] > time.monotonic() for entry in registry._due)
+    
+    @pytest.mark.asyncio
+    async def test_check_error_marks_endpoint_unhealthy(self, registry):
+        """Test that an endpoint whose check raises is marked unhealthy."""
+        registry.discovery.results[8001] = asyncio.TimeoutError()
+        
+        await registry._run_health_checks(_pop_due(registry))
+        
+        first, second = registry._endpoints_cache["svc"]
+        assert (first.healthy, second.healthy) == (False, True)
+        assert len(registry._due) == 2
+    
+    @pytest.mark.asyncio
+    async def test_session_failure_is_per_endpoint(self, registry, monkeypatch):
+        """Test that a failing session lookup keeps endpoints on the schedule."""
+        def missing_session():
+            raise ImportError("No module named 'aiohttp'")
+        
+        monkeypatch.setattr(registry, "_get_session", missing_session)
+        await registry._run_health_checks(_pop_due(registry))
+        
+        assert not any(ep.healthy for ep in registry._endpoints_cache["svc"])
+        assert len(registry._due) == 2
+        
+        # Once the fault clears, the next tick checks the endpoints again
+        monkeypatch.undo()
+        await registry._run_health_checks(_pop_due(registry))
+        
+        assert all(ep.healthy for ep in registry._endpoints_cache["svc"])
+        assert all(ep.last_check > 0.0 for ep in registry._endpoints_cache["svc"])
+    
+    @pytest.mark.asyncio
+    async def test_batch_rescheduled_when_tick_raises(self, registry, monkeypatch):
+        """Test that popped entries are requeued even if the tick itself raises."""
+        def broken_update(service_name):
+            raise RuntimeError("weights unavailable")
+        
+        monkeypatch.setattr(registry, "_update_weights", broken_update)
+        with pytest.raises(RuntimeError):
+            await registry._run_health_checks(_pop_due(registry))
+        
+        assert len(registry._due) == 2
+    
+    @pytest.mark.asyncio
+    async def test_dropped_endpoints_are_not_rescheduled(self, registry):
+        """Test that endpoints removed by a refresh leave the schedule."""
+        batch = _pop_due(registry)
+        registry.discovery.endpoints["svc"] = []
+        await registry._refresh_endpoints("svc")
+        
+        await registry._run_health_checks(batch)
+        
+        assert registry._due == []
+        assert registry.discovery.checked == []
+    
+    @pytest.mark.asyncio
+    async def test_scheduler_recovers_after_failing_tick(self, registry, monkeypatch):
+        """Test that the scheduler task keeps checking after a failing tick."""
+        registry._health_check_interval = 0.01
+        real_get_session = registry._get_session
+        calls = 0
+        
+        def flaky_session():
+            nonlocal calls
+            calls += 1
+            if calls == 1:
+                raise ImportError("No module named 'aiohttp'")
+            return real_get_session()
+        
+        monkeypatch.setattr(registry, "_get_session", flaky_session)
+        await registry.get_healthy_endpoints("svc")
+        
+        endpoints = registry._endpoints_cache["svc"]
+        for _ in range(100):
+            if all(ep.healthy and ep.last_check > 0.0 for ep in endpoints):
+                break
+            await asyncio.sleep(0.01)
+        
+        assert all(ep.healthy and ep.last_check > 0.0 for ep in endpoints)
+        assert len(registry._due) == 2
+
+
+class TestEndpointSelection:
+    """Test weighted endpoint selection in the service registry."""
+    
+    @pytest_asyncio.fixture
+    async def make_registry(self, monkeypatch):
+        """
+        Build registries for "svc" after one health check pass.
+        
+        Weighted draws cycle through 0..total-1, so every endpoint is picked
+        exactly in proportion to its weight over total_weight calls.
+        """
+        draws = itertools.count()
+        monkeypatch.setattr(
+            service_discovery_module,
+            "random",
+            SimpleNamespace(
+                randrange=lambda total: next(draws) % total,
+                uniform=lambda low, high: low,
+            ),
+        )
+        registries = []
+        
+        async def factory(weights, unhealthy=()):
+            endpoints = [
+                ServiceEndpoint(f"10.0.0.{port}", port, weight=weight)
+                for port, weight in enumerate(weights, start=1)
+            ]
+            discovery = FakeDiscovery({"svc": endpoints})
+            discovery.results.update({port: False for port in unhealthy})
+            registry = ServiceRegistry(discovery)
+            registries.append(registry)
+            await registry._refresh_endpoints("svc")
+            await registry._run_health_checks(_pop_due(registry))
+            return registry
+        
+        yield factory
+        
+        for registry in registries:
+            await registry.close()
+    
+    @staticmethod
+    async def _pick_ports(registry, count):
+        picks = [await registry.get_best_endpoint("svc") for _ in range(count)]
+        return [endpoint.port for endpoint in picks]
+    
+    @pytest.mark.asyncio
+    async def test_selection_follows_weights(self, make_registry):
+        """Test that endpoints are picked in proportion to their weights."""
+        registry = await make_registry([3, 1])
+        
+        ports = await self._pick_ports(registry, 400)
+        
+        assert (ports.count(1), ports.count(2)) == (300, 100)
+    
+    @pytest.mark.asyncio
+    async def test_zero_weight_endpoint_never_picked(self, make_registry):
+        """Test that a zero-weight endpoint is skipped while others have weight."""
+        registry = await make_registry([2, 0, 1])
+        
+        ports = await self._pick_ports(registry, 30)
+        
+        assert set(ports) == {1, 3}
+        assert (ports.count(1), ports.count(3)) == (20, 10)
+    
+    @pytest.mark.asyncio
+    async def test_unhealthy_endpoint_never_picked(self, make_registry):
+        """Test that only healthy endpoints are selected."""
+        registry = await make_registry([3, 1], unhealthy=[1])
+        
+        assert set(await self._pick_ports(registry, 20)) == {2}
+    
+    @pytest.mark.asyncio
+    async def test_all_zero_weights_round_robin(self, make_registry):
+        """Test that endpoints are rotated when every weight is zero."""
+        registry = await make_registry([0, 0, 0])
+        
+        ports = await self._pick_ports(registry, 6)
+        
+        assert sorted(ports) == [1, 1, 2, 2, 3, 3]
+        assert ports[:3] == ports[3:]
+    
+    @pytest.mark.asyncio
+    async def test_no_healthy_endpoints(self, make_registry):
+        """Test that selection returns None when every endpoint is down."""
+        registry = await make_registry([1, 1], unhealthy=[1, 2])
+        
+        assert await registry.get_best_endpoint("svc") is None
+    
+    @pytest.mark.asyncio
+    async def test_weights_rebuilt_when_health_changes(self, make_registry):
+        """Test that the weight table is reused until an endpoint's health flips."""
+        registry = await make_registry([3, 1])
+        weighted = registry._weighted["svc"]
+        
+        # A check pass with no health change keeps the cached table
+        await registry._run_health_checks(_pop_due(registry))
+        assert registry._weighted["svc"] is weighted
+        
+        registry.discovery.results[1] = False
+        await registry._run_health_checks(_pop_due(registry))
+        
+        assert registry._weighted["svc"] is not weighted
+        assert set(await self._pick_ports(registry, 10)) == {2}
+
+
+class TestKubernetesServiceDiscovery:
+    """Test DNS-based endpoint discovery."""
+    
+    @pytest.fixture
+    def lookups(self, monkeypatch):
+        """
+        Fake the event loop's getaddrinfo for the discovery module only.
+        
+        Returns the list of looked-up host names; set its "error" attribute
+        to make lookups raise.
+        """
+        class Lookups(list):
+            error = None
+        
+        lookups = Lookups()
+        
+        async def getaddrinfo(host, port):
+            lookups.append(host)
+            # Yield so concurrent lookups can pile up behind the first one
+            await asyncio.sleep(0)
+            if lookups.error is not None:
+                raise lookups.error
+            return [
+                (socket.AF_INET, socket.SOCK_STREAM, 6, "", ("10.0.0.1", 0)),
+                (socket.AF_INET, socket.SOCK_DGRAM, 17, "", ("10.0.0.1", 0)),
+                (socket.AF_INET, socket.SOCK_STREAM, 6, "", ("10.0.0.2", 0)),
+            ]
+        
+        loop = SimpleNamespace(getaddrinfo=getaddrinfo)
+        monkeypatch.setattr(
+            service_discovery_module,
+            "asyncio",
+            SimpleNamespace(Lock=asyncio.Lock, get_running_loop=lambda: loop),
+        )
+        return lookups
+    
+    @pytest.mark.asyncio
+    async def test_resolves_unique_addresses(self, lookups):
+        """Test that each resolved address becomes one endpoint on the default port."""
+        endpoints = await KubernetesServiceDiscovery().discover_endpoints("redis")
+        
+        assert sorted(ep.host for ep in endpoints) == ["10.0.0.1", "10.0.0.2"]
+        assert {ep.port for ep in endpoints} == {6379}
+        assert lookups == ["redis.default.svc.cluster.local."]
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_lookups_share_one_query(self, lookups):
+        """Test that concurrent discovery of one service issues a single DNS query."""
+        discovery = KubernetesServiceDiscovery()
+        
+        results = await asyncio.gather(
+            *(discovery.discover_endpoints("redis") for _ in range(5))
+        )
+        
+        assert len(lookups) == 1
+        assert all(len(endpoints) == 2 for endpoints in results)
+    
+    @pytest.mark.asyncio
+    async def test_lookups_cached_until_ttl(self, lookups):
+        """Test that results are served from cache and re-resolved after expiry."""
+        discovery = KubernetesServiceDiscovery()
+        
+        first = await discovery.discover_endpoints("redis")
+        first.clear()  # Callers get a copy, not the cached list
+        assert len(await discovery.discover_endpoints("redis")) == 2
+        assert len(lookups) == 1
+        
+        discovery._cache_ttl = 0
+        await discovery.discover_endpoints("redis")
+        assert len(lookups) == 2
+    
+    @pytest.mark.asyncio
+    async def test_failed_lookup_falls_back_uncached(self, lookups):
+        """Test that a failed lookup returns the bare service name and is retried."""
+        discovery = KubernetesServiceDiscovery()
+        lookups.error = OSError("Name or service not known")
+        
+        endpoints = await discovery.discover_endpoints("redis")
+        
+        assert [(ep.host, ep.port) for ep in endpoints] == [("redis", 6379)]
+        lookups.error = None
+        assert len(await discovery.discover_endpoints("redis")) == 2
+        assert len(lookups) == 2
+
+
+class TestStaticServiceDiscovery:
+    """Test the TCP health check used for statically configured endpoints."""
+    
+    @pytest.mark.asyncio
+    async def test_health_check_open_port(self):
+        """Test that an endpoint accepting connections is healthy."""
+        async def handle(reader, writer):
+            writer.close()
+        
+        server = await asyncio.start_server(handle, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            endpoint = ServiceEndpoint("127.0.0.1", port)
+            assert await StaticServiceDiscovery().health_check_endpoint(endpoint)
+        finally:
+            server.close()
+            await server.wait_closed()
+    
+    @pytest.mark.asyncio
+    async def test_health_check_closed_port(self):
+        """Test that an endpoint refusing connections is unhealthy."""
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+        
+        endpoint = ServiceEndpoint("127.0.0.1", port)
+        assert not await StaticServiceDiscovery().health_check_endpoint(endpoint)
@@ -0,0 +1,156 @@
+"""Unit tests for the ASGI health probe interceptor."""
+
+import json
+from datetime import datetime
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+from starlette.middleware.errors import ServerErrorMiddleware
+
+from src.shared.health_interceptor import (
+    HealthCheckInterceptor,
+    install_health_interceptor,
+)
+
+
+async def _call(interceptor, path, method="GET"):
+    """Drive the interceptor with a minimal HTTP scope and collect sent messages."""
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "path": path, "method": method}
+    await interceptor(scope, receive, send)
+    return sent
+
+
+@pytest.fixture
+def downstream_calls():
+    """Record calls that reach the wrapped application."""
+    return []
+
+
+@pytest.fixture
+def interceptor(downstream_calls):
+    """Build an interceptor wrapping a recording application."""
+    async def app(scope, receive, send):
+        downstream_calls.append(scope["path"])
+
+    return HealthCheckInterceptor(app, service_name="auth")
+
+
+@pytest.mark.asyncio
+async def test_health_probe_answered_directly(interceptor, downstream_calls):
+    """Test that GET /health is served without reaching the app."""
+    start, body = await _call(interceptor, "/health")
+
+    assert start["status"] == 200
+    assert (b"content-type", b"application/json") in start["headers"]
+    assert json.loads(body["body"]) == {"status": "healthy", "service": "auth"}
+    assert downstream_calls == []
+
+
+@pytest.mark.asyncio
+async def test_startup_probe_answered_directly(interceptor, downstream_calls):
+    """Test that GET /startup reports the started status."""
+    start, body = await _call(interceptor, "/startup")
+
+    assert start["status"] == 200
+    assert json.loads(body["body"])["status"] == "started"
+    assert downstream_calls == []
+
+
+@pytest.mark.asyncio
+async def test_probe_rejects_other_methods(interceptor):
+    """Test that non-GET requests to probe paths get 405 with an Allow header."""
+    start, _ = await _call(interceptor, "/health", method="POST")
+
+    assert start["status"] == 405
+    assert (b"allow", b"GET") in start["headers"]
+
+
+@pytest.mark.asyncio
+async def test_other_paths_pass_through(interceptor, downstream_calls):
+    """Test that non-probe paths are forwarded to the wrapped app."""
+    sent = await _call(interceptor, "/ready")
+
+    assert sent == []
+    assert downstream_calls == ["/ready"]
+
+
+@pytest.mark.asyncio
+async def test_unconfigured_probe_paths_pass_through(downstream_calls):
+    """Test that only the configured probe paths are intercepted."""
+    async def app(scope, receive, send):
+        downstream_calls.append(scope["path"])
+
+    interceptor = HealthCheckInterceptor(app, service_name="auth", paths=("/health",))
+    sent = await _call(interceptor, "/startup")
+
+    assert sent == []
+    assert downstream_calls == ["/startup"]
+
+
+@pytest.mark.asyncio
+async def test_timestamp_added_when_enabled(downstream_calls):
+    """Test that include_timestamp adds the current time to probe bodies."""
+    async def app(scope, receive, send):
+        downstream_calls.append(scope["path"])
+
+    interceptor = HealthCheckInterceptor(app, include_timestamp=True)
+    start, body = await _call(interceptor, "/startup")
+    payload = json.loads(body["body"])
+
+    assert start["status"] == 200
+    assert (b"content-length", str(len(body["body"])).encode()) in start["headers"]
+    assert payload["status"] == "started"
+    assert payload["service"] == "coins-for-change"
+    assert datetime.fromisoformat(payload["timestamp"]).tzinfo is not None
+
+
+@pytest.mark.asyncio
+async def test_installed_interceptor_is_outermost():
+    """Test that probes skip tracing and other middleware when installed."""
+    exporter = InMemorySpanExporter()
+    tracer_provider = TracerProvider()
+    tracer_provider.add_span_processor(SimpleSpanProcessor(exporter))
+    middleware_calls = []
+
+    app = FastAPI()
+
+    @app.get("/ready")
+    async def ready():
+        return {"status": "ready"}
+
+    @app.middleware("http")
+    async def record(request, call_next):
+        middleware_calls.append(request.url.path)
+        return await call_next(request)
+
+    FastAPIInstrumentor.instrument_app(app, tracer_provider=tracer_provider)
+    install_health_interceptor(app, service_name="auth", paths=("/health",))
+
+    stack = app.build_middleware_stack()
+    assert isinstance(stack, HealthCheckInterceptor)
+    assert isinstance(stack.app, ServerErrorMiddleware)
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        health = await client.get("/health")
+        assert health.status_code == 200
+        assert health.json() == {"status": "healthy", "service": "auth"}
+        assert middleware_calls == []
+        assert exporter.get_finished_spans() == ()
+
+        await client.get("/ready")
+        assert middleware_calls == ["/ready"]
+        assert exporter.get_finished_spans() != ()
@@ -0,0 +1,191 @@
+"""Unit tests for the shared request logging and security header middleware."""
+
+import re
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from src.shared import middleware as middleware_module
+from src.shared.logging.config import REQUEST_ID
+from src.shared.middleware import (
+    RequestLoggingMiddleware,
+    SecurityHeadersMiddleware,
+    setup_middleware,
+)
+
+
+class RecordingLogger:
+    """Logger stand-in that records each event with the bound request ID."""
+
+    def __init__(self):
+        self.records = []
+
+    def isEnabledFor(self, level):
+        return True
+
+    def _record(self, event, **kwargs):
+        self.records.append((event, REQUEST_ID.get(), kwargs))
+
+    debug = info = error = _record
+
+    @property
+    def events(self):
+        return [event for event, _, _ in self.records]
+
+
+@pytest.fixture
+def log(monkeypatch):
+    """Capture middleware log events."""
+    recorder = RecordingLogger()
+    monkeypatch.setattr(middleware_module, "logger", recorder)
+    return recorder
+
+
+async def _ok_app(scope, receive, send):
+    """Minimal application returning an empty 200 response."""
+    await send({
+        "type": "http.response.start",
+        "status": 200,
+        "headers": [(b"content-type", b"text/plain")],
+    })
+    await send({"type": "http.response.body", "body": b""})
+
+
+async def _failing_app(scope, receive, send):
+    raise RuntimeError("handler exploded")
+
+
+async def _call(middleware, path="/items", scope_type="http"):
+    """Drive a middleware with a minimal scope and collect sent messages."""
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        "type": scope_type,
+        "method": "GET",
+        "path": path,
+        "scheme": "http",
+        "server": ("test", 80),
+        "query_string": b"",
+        "headers": [],
+    }
+    await middleware(scope, receive, send)
+    return sent
+
+
+def _header_names(start_message):
+    return [name for name, _ in start_message["headers"]]
+
+
+@pytest.mark.asyncio
+async def test_request_id_added_to_response(log):
+    """Test that each response carries the request ID bound while logging."""
+    start, _ = await _call(RequestLoggingMiddleware(_ok_app))
+
+    request_ids = [
+        value for name, value in start["headers"] if name.lower() == b"x-request-id"
+    ]
+    assert len(request_ids) == 1
+    assert re.fullmatch(rb"[0-9a-f]{32}", request_ids[0])
+
+    event, bound_request_id, fields = log.records[-1]
+    assert event == "Request completed"
+    assert bound_request_id == request_ids[0].decode()
+    assert fields["status_code"] == 200
+
+
+@pytest.mark.asyncio
+async def test_request_id_reset_after_request(log):
+    """Test that the request ID is unbound once the request completes."""
+    await _call(RequestLoggingMiddleware(_ok_app))
+
+    assert REQUEST_ID.get() == ""
+
+
+@pytest.mark.asyncio
+async def test_request_id_reset_after_error(log):
+    """Test that a failing request is logged and still unbinds its request ID."""
+    with pytest.raises(RuntimeError, match="handler exploded"):
+        await _call(RequestLoggingMiddleware(_failing_app))
+
+    assert REQUEST_ID.get() == ""
+    event, bound_request_id, fields = log.records[-1]
+    assert event == "Request failed"
+    assert bound_request_id != ""
+    assert fields["error"] == "handler exploded"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("path", ["/health", "/ready", "/health/detailed"])
+async def test_unlogged_paths_skip_completion_log(log, path):
+    """Test that probe and monitoring paths are not logged per request."""
+    sent = await _call(RequestLoggingMiddleware(_ok_app), path=path)
+
+    assert sent[0]["status"] == 200
+    assert "Request completed" not in log.events
+
+
+@pytest.mark.asyncio
+async def test_security_headers_appended_once():
+    """Test that every security header is sent exactly once per response."""
+    middleware = SecurityHeadersMiddleware(_ok_app)
+
+    # A second request must not see headers accumulated by the first
+    await _call(middleware)
+    start, _ = await _call(middleware)
+
+    names = _header_names(start)
+    for name, _ in SecurityHeadersMiddleware._HEADERS:
+        assert names.count(name) == 1
+    assert names.count(b"content-type") == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "middleware_class", [RequestLoggingMiddleware, SecurityHeadersMiddleware]
+)
+async def test_non_http_scopes_pass_through(log, middleware_class):
+    """Test that non-HTTP scopes reach the app with the original send."""
+    calls = []
+
+    async def app(scope, receive, send):
+        calls.append((scope["type"], send, REQUEST_ID.get()))
+
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "lifespan"}
+    await middleware_class(app)(scope, None, send)
+
+    assert calls == [("lifespan", send, "")]
+    assert log.records == []
+
+
+@pytest.mark.asyncio
+async def test_setup_middleware_stack(log):
+    """Test the combined stack on a service app built by setup_middleware."""
+    app = FastAPI()
+
+    @app.get("/items")
+    async def items():
+        return []
+
+    setup_middleware(app, service_name="test")
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get("/items")
+
+    assert response.status_code == 200
+    assert re.fullmatch(r"[0-9a-f]{32}", response.headers["x-request-id"])
+    for name, value in SecurityHeadersMiddleware._HEADERS:
+        assert response.headers.get_list(name.decode()) == [value.decode()]
+    assert log.events.count("Request completed") == 1